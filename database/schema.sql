@@ -298,6 +298,20 @@ CREATE VIRTUAL TABLE IF NOT EXISTS memory_fts USING fts5(
     tokenize='porter'
 );
 
+-- File content locations, kept in sync by the content_locations_fts_* triggers
+CREATE VIRTUAL TABLE IF NOT EXISTS content_locations_fts USING fts5(
+    description,
+    snippet,
+    content='content_locations',
+    content_rowid='id',
+    tokenize='porter unicode61'
+);
+
+-- Backfill rows that predate the index (no-op once it is in sync)
+INSERT INTO content_locations_fts(content_locations_fts)
+SELECT 'rebuild'
+WHERE (SELECT COUNT(*) FROM content_locations_fts_docsize) != (SELECT COUNT(*) FROM content_locations);
+
 -- ============================================================
 -- SEMANTIC SEARCH (sqlite-vec)
 -- Note: This requires sqlite-vec extension to be loaded
@@ -568,8 +582,14 @@ CREATE INDEX IF NOT EXISTS idx_conversations_project ON conversations(project_id
 CREATE INDEX IF NOT EXISTS idx_conversations_session ON conversations(session_id);
 CREATE INDEX IF NOT EXISTS idx_learnings_project ON learnings(project_id);
 CREATE INDEX IF NOT EXISTS idx_sessions_project ON sessions(project_id);
+CREATE INDEX IF NOT EXISTS idx_conversations_project_created ON conversations(project_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_sessions_project_started ON sessions(project_id, started_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_embeddings_project ON embeddings(project_id);
 CREATE INDEX IF NOT EXISTS idx_embeddings_type ON embeddings(content_type);
+CREATE INDEX IF NOT EXISTS idx_xref_source ON cross_references(source_type, source_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_xref_target ON cross_references(target_type, target_id);
+CREATE INDEX IF NOT EXISTS idx_xref_source_project ON cross_references(source_project_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_xref_target_project ON cross_references(target_project_id, created_at DESC);
 
 -- v1.1 indexes
 CREATE INDEX IF NOT EXISTS idx_attachments_project ON attachments(project_id);
@@ -656,6 +676,111 @@ BEGIN
     UPDATE settings SET updated_at = CURRENT_TIMESTAMP WHERE key = NEW.key;
 END;
 
+-- Index new changes for search in the inserting transaction (same row
+-- format as Database.index_for_search)
+CREATE TRIGGER IF NOT EXISTS changes_search_index
+AFTER INSERT ON changes
+BEGIN
+    INSERT INTO memory_fts (content_type, content_id, project_id, searchable_text)
+    SELECT 'change', CAST(NEW.id AS TEXT), CAST(c.project_id AS TEXT),
+           NEW.field_name || ' ' || COALESCE(NEW.old_value, '') || ' ' ||
+           COALESCE(NEW.new_value, '') || ' ' || COALESCE(NEW.reason, '')
+    FROM components c WHERE c.id = NEW.component_id;
+END;
+
+-- Likewise for learnings, so inserts from the GUI are searchable too
+CREATE TRIGGER IF NOT EXISTS learnings_search_index
+AFTER INSERT ON learnings
+BEGIN
+    INSERT INTO memory_fts (content_type, content_id, project_id, searchable_text)
+    VALUES ('learning', CAST(NEW.id AS TEXT), CAST(NEW.project_id AS TEXT),
+            NEW.insight || ' ' || COALESCE(NEW.context, '') || ' ' || COALESCE(NEW.category, ''));
+END;
+
+-- Problems and solutions, with their index rows replaced when the text
+-- changes and dropped when the row is deleted (incl. cascades). Text
+-- shorter than 3 characters can't match a useful query, so it is not
+-- indexed.
+CREATE TRIGGER IF NOT EXISTS problems_search_index
+AFTER INSERT ON problems
+WHEN length(trim(NEW.title || ' ' || COALESCE(NEW.description, ''))) >= 3
+BEGIN
+    INSERT INTO memory_fts (content_type, content_id, project_id, searchable_text)
+    SELECT 'problem', CAST(NEW.id AS TEXT), CAST(c.project_id AS TEXT),
+           NEW.title || ' ' || COALESCE(NEW.description, '')
+    FROM components c WHERE c.id = NEW.component_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS problems_search_reindex
+AFTER UPDATE OF title, description ON problems
+BEGIN
+    DELETE FROM memory_fts WHERE content_type = 'problem' AND content_id = CAST(OLD.id AS TEXT);
+    INSERT INTO memory_fts (content_type, content_id, project_id, searchable_text)
+    SELECT 'problem', CAST(NEW.id AS TEXT), CAST(c.project_id AS TEXT),
+           NEW.title || ' ' || COALESCE(NEW.description, '')
+    FROM components c
+    WHERE c.id = NEW.component_id
+      AND length(trim(NEW.title || ' ' || COALESCE(NEW.description, ''))) >= 3;
+END;
+
+CREATE TRIGGER IF NOT EXISTS problems_search_unindex
+AFTER DELETE ON problems
+BEGIN
+    DELETE FROM memory_fts WHERE content_type = 'problem' AND content_id = CAST(OLD.id AS TEXT);
+END;
+
+CREATE TRIGGER IF NOT EXISTS solutions_search_index
+AFTER INSERT ON solutions
+WHEN length(trim(NEW.summary || ' ' || COALESCE(NEW.key_insight, ''))) >= 3
+BEGIN
+    INSERT INTO memory_fts (content_type, content_id, project_id, searchable_text)
+    SELECT 'solution', CAST(NEW.id AS TEXT), CAST(c.project_id AS TEXT),
+           NEW.summary || ' ' || COALESCE(NEW.key_insight, '')
+    FROM problems p JOIN components c ON c.id = p.component_id
+    WHERE p.id = NEW.problem_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS solutions_search_reindex
+AFTER UPDATE OF summary, key_insight ON solutions
+BEGIN
+    DELETE FROM memory_fts WHERE content_type = 'solution' AND content_id = CAST(OLD.id AS TEXT);
+    INSERT INTO memory_fts (content_type, content_id, project_id, searchable_text)
+    SELECT 'solution', CAST(NEW.id AS TEXT), CAST(c.project_id AS TEXT),
+           NEW.summary || ' ' || COALESCE(NEW.key_insight, '')
+    FROM problems p JOIN components c ON c.id = p.component_id
+    WHERE p.id = NEW.problem_id
+      AND length(trim(NEW.summary || ' ' || COALESCE(NEW.key_insight, ''))) >= 3;
+END;
+
+CREATE TRIGGER IF NOT EXISTS solutions_search_unindex
+AFTER DELETE ON solutions
+BEGIN
+    DELETE FROM memory_fts WHERE content_type = 'solution' AND content_id = CAST(OLD.id AS TEXT);
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_locations_fts_insert
+AFTER INSERT ON content_locations
+BEGIN
+    INSERT INTO content_locations_fts(rowid, description, snippet)
+    VALUES (NEW.id, NEW.description, NEW.snippet);
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_locations_fts_delete
+AFTER DELETE ON content_locations
+BEGIN
+    INSERT INTO content_locations_fts(content_locations_fts, rowid, description, snippet)
+    VALUES ('delete', OLD.id, OLD.description, OLD.snippet);
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_locations_fts_update
+AFTER UPDATE OF description, snippet ON content_locations
+BEGIN
+    INSERT INTO content_locations_fts(content_locations_fts, rowid, description, snippet)
+    VALUES ('delete', OLD.id, OLD.description, OLD.snippet);
+    INSERT INTO content_locations_fts(rowid, description, snippet)
+    VALUES (NEW.id, NEW.description, NEW.snippet);
+END;
+
 -- v1.2 triggers
 CREATE TRIGGER IF NOT EXISTS update_project_variables_timestamp 
 AFTER UPDATE ON project_variables
@@ -1,9 +1,13 @@
 """SQLite database operations for FlowState."""
 
+import functools
 import json
 import os
 import platform
 import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional
 from datetime import datetime, timedelta
@@ -27,24 +31,207 @@ else:
     DEFAULT_DB_PATH = Path.home() / ".local" / "share" / "flowstate" / "flowstate.db"
 SCHEMA_PATH = Path(__file__).parent.parent.parent / "database" / "schema.sql"
 
+# repr -> JSON text for small values that repeat across calls (tool
+# parameters, registry lists). repr is the key because it differs whenever
+# the JSON would (unlike hash(repr), which can collide).
+_JSON_CACHE: OrderedDict[str, str] = OrderedDict()
+_JSON_CACHE_SIZE = 1024
+_JSON_CACHE_MAX_KEY = 512
+_JSON_CACHE_LOCK = threading.Lock()
+
+
+def _encode_json(value) -> str:
+    """json.dumps(value), memoized (LRU) for values with a short repr."""
+    key = repr(value)
+    if len(key) > _JSON_CACHE_MAX_KEY:
+        return json.dumps(value)
+    with _JSON_CACHE_LOCK:
+        text = _JSON_CACHE.get(key)
+        if text is not None:
+            _JSON_CACHE.move_to_end(key)
+            return text
+    text = json.dumps(value)
+    with _JSON_CACHE_LOCK:
+        _JSON_CACHE[key] = text
+        if len(_JSON_CACHE) > _JSON_CACHE_SIZE:
+            _JSON_CACHE.popitem(last=False)
+    return text
+
+
+# Shared by the single-row and bulk logging methods; the single-row ones
+# append RETURNING (executemany can't return rows)
+_INSERT_TOOL_USAGE_SQL = """INSERT INTO tool_usage 
+   (project_id, session_state_id, tool_registry_id, mcp_server, tool_name,
+    parameters, result_size, execution_time_ms, task_type, trigger, preceding_tool_id)
+   VALUES (?, ?,
+           (SELECT id FROM tool_registry WHERE mcp_server = ? AND tool_name = ?),
+           ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+_INSERT_METRIC_SQL = """INSERT INTO algorithm_metrics 
+   (project_id, session_state_id, metric_type, context, action_taken,
+    outcome, effectiveness_score, user_feedback, should_adjust, suggested_adjustment)
+   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+
+# Column order of problems / solution_attempts / solutions, as bound into
+# the models by get_problem_tree_bundle
+_PROBLEM_COLUMNS = (
+    "id", "component_id", "title", "description", "status", "severity",
+    "root_cause", "created_at", "solved_at",
+)
+_ATTEMPT_COLUMNS = (
+    "id", "problem_id", "parent_attempt_id", "description", "outcome",
+    "confidence", "notes", "created_at",
+)
+_SOLUTION_COLUMNS = (
+    "id", "problem_id", "winning_attempt_id", "summary", "code_snippet",
+    "key_insight", "created_at",
+)
+
+# A problem, its attempts and its solution in one statement. Rows are
+# tagged with a kind (0 = problem, 1 = attempt, 2 = solution) and padded
+# with NULLs to the widest table; attempts come back oldest first.
+_PROBLEM_TREE_SQL = f"""
+    SELECT 0 AS kind, NULL AS sort_key, {', '.join(_PROBLEM_COLUMNS)}
+      FROM problems WHERE id = :problem_id
+    UNION ALL
+    SELECT 1, created_at, {', '.join(_ATTEMPT_COLUMNS)}, NULL
+      FROM solution_attempts WHERE problem_id = :problem_id
+    UNION ALL
+    SELECT 2, NULL, {', '.join(_SOLUTION_COLUMNS)}, NULL, NULL
+      FROM solutions WHERE problem_id = :problem_id
+    ORDER BY kind, sort_key, id
+"""
+
+
+# Sections of get_project_story_page: name -> (query over the project's
+# rows aliased as t, table name, sort column, newest first?). Each is
+# paged by keyset on (sort column, id), matching get_project_story_data's
+# ordering.
+_STORY_SECTIONS = {
+    "components": (
+        "SELECT t.* FROM components t WHERE t.project_id = :project_id",
+        "components", "name", False,
+    ),
+    "problems": (
+        """SELECT t.* FROM problems t
+           JOIN components c ON t.component_id = c.id
+           WHERE c.project_id = :project_id""",
+        "problems", "created_at", False,
+    ),
+    "changes": (
+        """SELECT t.*, comp.name AS component_name FROM changes t
+           JOIN components comp ON t.component_id = comp.id
+           WHERE comp.project_id = :project_id""",
+        "changes", "created_at", False,
+    ),
+    "learnings": (
+        "SELECT t.* FROM learnings t WHERE t.project_id = :project_id",
+        "learnings", "created_at", True,
+    ),
+    "sessions": (
+        "SELECT t.* FROM sessions t WHERE t.project_id = :project_id",
+        "sessions", "started_at", False,
+    ),
+}
+
+# Whole-project totals for a story page, independent of paging
+_STORY_STATS_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM problems p JOIN components c ON p.component_id = c.id
+          WHERE c.project_id = :project_id) AS total_problems,
+        (SELECT COUNT(*) FROM problems p JOIN components c ON p.component_id = c.id
+          WHERE c.project_id = :project_id AND p.status = 'solved') AS solved_problems,
+        (SELECT COUNT(*) FROM changes ch JOIN components c ON ch.component_id = c.id
+          WHERE c.project_id = :project_id) AS total_changes,
+        (SELECT COUNT(*) FROM learnings WHERE project_id = :project_id) AS total_learnings,
+        (SELECT COUNT(*) FROM sessions WHERE project_id = :project_id) AS total_sessions,
+        (SELECT COUNT(*) FROM components WHERE project_id = :project_id) AS components_count,
+        (SELECT MIN(p.created_at) FROM problems p JOIN components c ON p.component_id = c.id
+          WHERE c.project_id = :project_id) AS first_problem_at
+"""
+
+
+def _tool_usage_params(
+    mcp_server: str,
+    tool_name: str,
+    project_id: Optional[int] = None,
+    session_state_id: Optional[int] = None,
+    parameters: Optional[dict] = None,
+    result_size: Optional[int] = None,
+    execution_time_ms: Optional[int] = None,
+    task_type: Optional[str] = None,
+    trigger: Optional[str] = None,
+    preceding_tool_id: Optional[int] = None
+) -> tuple:
+    """Bind parameters for _INSERT_TOOL_USAGE_SQL, from log_tool_use's arguments."""
+    return (project_id, session_state_id, mcp_server, tool_name, mcp_server, tool_name,
+            _encode_json(parameters) if parameters else None,
+            result_size, execution_time_ms, task_type, trigger, preceding_tool_id)
+
+
+def _tool_usage_dict(row: sqlite3.Row) -> dict:
+    """A tool_usage row as a dict with its parameters decoded."""
+    result = dict(row)
+    if result.get('parameters'):
+        result['parameters'] = json.loads(result['parameters'])
+    return result
+
+
+def _metric_params(
+    metric_type: str,
+    context: Optional[str] = None,
+    action_taken: Optional[str] = None,
+    outcome: Optional[str] = None,
+    effectiveness_score: Optional[float] = None,
+    user_feedback: Optional[str] = None,
+    should_adjust: Optional[bool] = None,
+    suggested_adjustment: Optional[str] = None,
+    project_id: Optional[int] = None,
+    session_state_id: Optional[int] = None
+) -> tuple:
+    """Bind parameters for _INSERT_METRIC_SQL, from log_metric's arguments."""
+    return (project_id, session_state_id, metric_type, context, action_taken,
+            outcome, effectiveness_score, user_feedback, should_adjust, suggested_adjustment)
+
+
+# Database.maintain() vacuums once this fraction of pages is free
+_VACUUM_FREE_RATIO = 0.25
+
 
 def get_connection(db_path: Optional[Path] = None) -> sqlite3.Connection:
     """Get a database connection with row factory."""
     path = db_path or DEFAULT_DB_PATH
     path.parent.mkdir(parents=True, exist_ok=True)
     
-    conn = sqlite3.connect(str(path))
+    # Room for every distinct statement the tools issue on a pooled
+    # connection (the default cache holds 128)
+    conn = sqlite3.connect(str(path), cached_statements=256)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA foreign_keys = ON")
     return conn
 
 
+@functools.lru_cache(maxsize=1)
+def _load_schema() -> tuple[str, int]:
+    """schema.sql's text and the PRAGMA user_version stamp identifying it."""
+    with open(SCHEMA_PATH) as f:
+        schema = f.read()
+    # Non-zero so a brand-new (user_version 0) file never looks current
+    return schema, (zlib.crc32(schema.encode()) & 0x7FFFFFFF) or 1
+
+
 def init_db(db_path: Optional[Path] = None) -> None:
-    """Initialize the database with schema."""
+    """Initialize the database with schema (skipped if already applied)."""
+    schema, stamp = _load_schema()
     conn = get_connection(db_path)
     try:
-        with open(SCHEMA_PATH) as f:
-            conn.executescript(f.read())
+        # Persistent - stored in the file, so every later connection uses it
+        conn.execute("PRAGMA journal_mode = WAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] == stamp:
+            return
+        conn.executescript(schema)
+        conn.execute(f"PRAGMA user_version = {stamp}")
         conn.commit()
     finally:
         conn.close()
@@ -55,13 +242,109 @@ class Database:
     
     def __init__(self, db_path: Optional[Path] = None):
         self.db_path = db_path or DEFAULT_DB_PATH
-        # Ensure DB exists
-        if not self.db_path.exists():
-            init_db(self.db_path)
+        # Create the DB, or add tables/indexes/triggers an older file is
+        # missing - the schema is idempotent, the GUI applies it on every open.
+        # A file already stamped with this schema.sql revision is left alone.
+        init_db(self.db_path)
+        self._local = threading.local()
+        # Bumped by reset_connections(); a pooled connection opened under an
+        # older generation is reopened on its thread's next get_conn()
+        self._generation = 0
     
     def _conn(self) -> sqlite3.Connection:
         return get_connection(self.db_path)
     
+    def _file_id(self) -> Optional[tuple[int, int]]:
+        """(st_dev, st_ino) of the database file, or None if it's missing."""
+        try:
+            st = os.stat(self.db_path)
+        except OSError:
+            return None
+        return st.st_dev, st.st_ino
+    
+    def get_conn(self) -> sqlite3.Connection:
+        """
+        Get this thread's long-lived connection.
+        Opened on first use and kept for the life of the thread - callers
+        must not close it. Reopened when the database file is replaced
+        (git checkout/pull/clone write a new file rather than updating it
+        in place) or after reset_connections().
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and (
+            self._local.generation != self._generation
+            or self._local.file_id != self._file_id()
+        ):
+            conn.close()
+            conn = self._local.conn = None
+        if conn is None:
+            generation = self._generation
+            conn = get_connection(self.db_path)
+            # Per-connection tuning - only worth it on a connection that's
+            # kept, not on the short-lived ones from _conn()
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA cache_size = -65536")  # 64 MiB
+            conn.execute("PRAGMA mmap_size = 268435456")  # 256 MiB
+            conn.execute("PRAGMA temp_store = MEMORY")
+            # Recommended on open for long-lived connections: analyze only
+            # tables whose stats are missing or stale, with a cheap limit
+            conn.execute("PRAGMA optimize = 0x10002")
+            self._local.conn = conn
+            self._local.generation = generation
+            self._local.file_id = self._file_id()
+        return conn
+    
+    def reset_connections(self) -> None:
+        """
+        Make every thread reopen its pooled connection on its next get_conn()
+        (connections can only be closed by their own thread). Closes the
+        calling thread's connection right away.
+        """
+        self._generation += 1
+        self.close()
+    
+    def close(self) -> None:
+        """Close this thread's long-lived connection, if one is open."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
+    def checkpoint(self) -> bool:
+        """
+        Fold the WAL back into the main database file (e.g. before a git sync).
+        Returns False if it couldn't finish - another connection kept a read
+        transaction open past the busy timeout - so the main file alone is
+        not current.
+        """
+        busy, log, checkpointed = self.get_conn().execute(
+            "PRAGMA wal_checkpoint(TRUNCATE)"
+        ).fetchone()
+        return not busy and log == checkpointed
+    
+    def maintain(self) -> None:
+        """
+        Periodic upkeep for a long-lived database: refresh planner stats
+        and truncate the WAL. Once enough pages are free (e.g. after
+        FTS churn or deletes), also merge the FTS indexes and VACUUM.
+        Raises sqlite3.OperationalError if another connection holds the
+        database busy; callers just try again later.
+        """
+        conn = self.get_conn()
+        conn.execute("PRAGMA optimize")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if page_count and free_pages / page_count >= _VACUUM_FREE_RATIO:
+            with conn:
+                conn.execute("INSERT INTO memory_fts(memory_fts) VALUES ('optimize')")
+                conn.execute(
+                    "INSERT INTO content_locations_fts(content_locations_fts) VALUES ('optimize')"
+                )
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    
     # ========================================================
     # PROJECTS
     # ========================================================
@@ -246,6 +529,48 @@ class Database:
         finally:
             conn.close()
     
+    def log_change_and_index(
+        self,
+        component_id: int,
+        field_name: str,
+        old_value: Optional[str] = None,
+        new_value: Optional[str] = None,
+        change_type: Optional[str] = None,
+        reason: Optional[str] = None
+    ) -> tuple[Change, int]:
+        """
+        Log a change, returning it with its project_id in one statement.
+        The changes_search_index trigger indexes it for search as part of
+        the same insert.
+        """
+        conn = self._conn()
+        try:
+            with conn:
+                row = conn.execute(
+                    """INSERT INTO changes 
+                       (component_id, field_name, old_value, new_value, change_type, reason)
+                       VALUES (?, ?, ?, ?, ?, ?)
+                       RETURNING *, (SELECT project_id FROM components WHERE id = ?) AS project_id""",
+                    (component_id, field_name, old_value, new_value, change_type, reason,
+                     component_id)
+                ).fetchone()
+            data = dict(row)
+            project_id = data.pop("project_id")
+            return Change(**data), project_id
+        finally:
+            conn.close()
+    
+    def get_change(self, change_id: int) -> Optional[Change]:
+        """Get a change by ID."""
+        conn = self._conn()
+        try:
+            row = conn.execute(
+                "SELECT * FROM changes WHERE id = ?", (change_id,)
+            ).fetchone()
+            return Change(**dict(row)) if row else None
+        finally:
+            conn.close()
+    
     def get_recent_changes(
         self, 
         project_id: Optional[int] = None,
@@ -296,17 +621,31 @@ class Database:
         severity: str = "medium"
     ) -> Problem:
         """Log a new problem."""
-        conn = self._conn()
-        try:
-            cursor = conn.execute(
+        return self.log_problem_with_project(component_id, title, description, severity)[0]
+    
+    def log_problem_with_project(
+        self,
+        component_id: int,
+        title: str,
+        description: Optional[str] = None,
+        severity: str = "medium"
+    ) -> tuple[Problem, int]:
+        """
+        Log a new problem and return it with its component's project_id,
+        read by the INSERT itself rather than a separate component lookup.
+        """
+        conn = self.get_conn()
+        with conn:
+            row = conn.execute(
                 """INSERT INTO problems (component_id, title, description, severity)
-                   VALUES (?, ?, ?, ?)""",
+                   VALUES (?, ?, ?, ?)
+                   RETURNING *, (SELECT project_id FROM components
+                                 WHERE components.id = component_id) AS project_id""",
                 (component_id, title, description, severity)
-            )
-            conn.commit()
-            return self.get_problem(cursor.lastrowid)
-        finally:
-            conn.close()
+            ).fetchone()
+        data = dict(row)
+        project_id = data.pop('project_id')
+        return Problem(**data), project_id
     
     def get_problem(self, problem_id: int) -> Optional[Problem]:
         """Get a problem by ID."""
@@ -450,29 +789,41 @@ class Database:
         code_snippet: Optional[str] = None
     ) -> Solution:
         """Mark a problem as solved."""
-        conn = self._conn()
-        try:
+        return self.mark_problem_solved_with_project(
+            problem_id, winning_attempt_id, summary, key_insight, code_snippet
+        )[0]
+    
+    def mark_problem_solved_with_project(
+        self,
+        problem_id: int,
+        winning_attempt_id: Optional[int],
+        summary: str,
+        key_insight: Optional[str] = None,
+        code_snippet: Optional[str] = None
+    ) -> tuple[Solution, Optional[int]]:
+        """
+        Mark a problem as solved and return the solution with the project_id
+        of the problem's component, read by the status UPDATE itself.
+        """
+        conn = self.get_conn()
+        with conn:
             # Update problem status
-            conn.execute(
-                "UPDATE problems SET status = 'solved' WHERE id = ?",
+            project = conn.execute(
+                """UPDATE problems SET status = 'solved' WHERE id = ?
+                   RETURNING (SELECT project_id FROM components
+                              WHERE components.id = component_id)""",
                 (problem_id,)
-            )
+            ).fetchone()
             
             # Create solution record
-            cursor = conn.execute(
+            row = conn.execute(
                 """INSERT INTO solutions 
                    (problem_id, winning_attempt_id, summary, key_insight, code_snippet)
-                   VALUES (?, ?, ?, ?, ?)""",
+                   VALUES (?, ?, ?, ?, ?)
+                   RETURNING *""",
                 (problem_id, winning_attempt_id, summary, key_insight, code_snippet)
-            )
-            conn.commit()
-            
-            row = conn.execute(
-                "SELECT * FROM solutions WHERE id = ?", (cursor.lastrowid,)
             ).fetchone()
-            return Solution(**dict(row))
-        finally:
-            conn.close()
+        return Solution(**dict(row)), project[0] if project else None
     
     def get_solution(self, problem_id: int) -> Optional[Solution]:
         """Get the solution for a problem."""
@@ -485,6 +836,28 @@ class Database:
         finally:
             conn.close()
     
+    def get_problem_tree_bundle(
+        self, problem_id: int
+    ) -> tuple[Optional[Problem], list[SolutionAttempt], Optional[Solution]]:
+        """
+        Get a problem with its attempts and solution in one round-trip.
+        Returns (None, [], None) if the problem doesn't exist.
+        """
+        problem = None
+        attempts = []
+        solution = None
+        for row in self.get_conn().execute(_PROBLEM_TREE_SQL, {"problem_id": problem_id}):
+            kind = row[0]
+            if kind == 0:
+                problem = Problem(**dict(zip(_PROBLEM_COLUMNS, row[2:])))
+            elif kind == 1:
+                attempts.append(SolutionAttempt(**dict(zip(_ATTEMPT_COLUMNS, row[2:]))))
+            else:
+                solution = Solution(**dict(zip(_SOLUTION_COLUMNS, row[2:])))
+        if problem is None:
+            return None, [], None
+        return problem, attempts, solution
+    
     # ========================================================
     # TODOS
     # ========================================================
@@ -579,20 +952,30 @@ class Database:
         component_id: Optional[int] = None,
         source: str = "experience"
     ) -> Learning:
-        """Log a learning/insight."""
-        conn = self._conn()
-        try:
-            cursor = conn.execute(
+        """
+        Log a learning/insight.
+        Runs on this thread's pooled connection - learnings are logged
+        throughout a session, so skip the per-call connection setup.
+        """
+        conn = self.get_conn()
+        with conn:
+            row = conn.execute(
                 """INSERT INTO learnings 
                    (project_id, insight, category, context, component_id, source)
-                   VALUES (?, ?, ?, ?, ?, ?)""",
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   RETURNING *""",
                 (project_id, insight, category, context, component_id, source)
-            )
-            conn.commit()
+            ).fetchone()
+        return Learning(**dict(row))
+    
+    def get_learning(self, learning_id: int) -> Optional[Learning]:
+        """Get a learning by ID."""
+        conn = self._conn()
+        try:
             row = conn.execute(
-                "SELECT * FROM learnings WHERE id = ?", (cursor.lastrowid,)
+                "SELECT * FROM learnings WHERE id = ?", (learning_id,)
             ).fetchone()
-            return Learning(**dict(row))
+            return Learning(**dict(row)) if row else None
         finally:
             conn.close()
     
@@ -605,25 +988,64 @@ class Database:
         """Get learnings with optional filters."""
         conn = self._conn()
         try:
-            query = "SELECT * FROM learnings WHERE 1=1"
-            params = []
-            
-            if project_id:
-                query += " AND project_id = ?"
-                params.append(project_id)
-            if category:
-                query += " AND category = ?"
-                params.append(category)
-            if verified_only:
-                query += " AND verified = 1"
-            
-            query += " ORDER BY created_at DESC"
-            
-            rows = conn.execute(query, params).fetchall()
+            where, params = self._learnings_filter(project_id, category, verified_only)
+            rows = conn.execute(
+                f"SELECT * FROM learnings {where} ORDER BY created_at DESC", params
+            ).fetchall()
             return [Learning(**dict(row)) for row in rows]
         finally:
             conn.close()
     
+    def get_learnings_compact(
+        self,
+        project_id: Optional[int] = None,
+        category: Optional[str] = None,
+        verified_only: bool = False,
+        max_text_len: int = 100
+    ) -> list[dict]:
+        """
+        Learnings shaped like _compact_list(get_learnings(...)), built in SQL.
+        Long text is truncated and timestamps are left out by the query, so
+        no Learning models are constructed.
+        """
+        where, params = self._learnings_filter(project_id, category, verified_only)
+        cursor = self.get_conn().execute(
+            f"""SELECT id, project_id, component_id, category,
+                       CASE WHEN length(insight) > :max_len
+                            THEN substr(insight, 1, :max_len) || '...' ELSE insight END AS insight,
+                       CASE WHEN length(context) > :max_len
+                            THEN substr(context, 1, :max_len) || '...' ELSE context END AS context,
+                       source, verified
+                FROM learnings {where} ORDER BY created_at DESC""",
+            {**params, "max_len": max_text_len}
+        )
+        columns = [d[0] for d in cursor.description]
+        result = []
+        for row in cursor:
+            learning = {k: v for k, v in zip(columns, row) if v is not None and v != ''}
+            learning['verified'] = bool(learning['verified'])
+            result.append(learning)
+        return result
+    
+    @staticmethod
+    def _learnings_filter(
+        project_id: Optional[int],
+        category: Optional[str],
+        verified_only: bool
+    ) -> tuple[str, dict]:
+        """WHERE clause and named parameters shared by the get_learnings variants."""
+        clauses = []
+        params = {}
+        if project_id:
+            clauses.append("project_id = :project_id")
+            params["project_id"] = project_id
+        if category:
+            clauses.append("category = :category")
+            params["category"] = category
+        if verified_only:
+            clauses.append("verified = 1")
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
+    
     # ========================================================
     # CONVERSATIONS
     # ========================================================
@@ -790,6 +1212,73 @@ class Database:
             current_session=self.get_current_session(project.id)
         )
     
+    def get_project_context_lean(
+        self,
+        project_name: str,
+        hours: int = 48
+    ) -> Optional[dict]:
+        """
+        Counts and a few preview rows for a project, computed in SQL.
+        Same filters as get_project_context (blocking problems list critical
+        before high), but nothing is materialized beyond the lean view.
+        """
+        conn = self._conn()
+        try:
+            cutoff = datetime.now() - timedelta(hours=hours)
+            project = conn.execute(
+                """SELECT p.id, p.name, p.status,
+                       (SELECT COUNT(*) FROM components WHERE project_id = p.id) AS components,
+                       (SELECT COUNT(*) FROM problems pr
+                        JOIN components c ON pr.component_id = c.id
+                        WHERE c.project_id = p.id AND pr.status IN ('open', 'investigating')
+                       ) AS open_problems,
+                       (SELECT COUNT(*) FROM todos
+                        WHERE project_id = p.id AND status = 'pending') AS pending_todos,
+                       (SELECT COUNT(*) FROM changes ch
+                        JOIN components c ON ch.component_id = c.id
+                        WHERE c.project_id = p.id AND ch.created_at > ?) AS recent_changes,
+                       MIN((SELECT COUNT(*) FROM learnings WHERE project_id = p.id), 10) AS learnings,
+                       EXISTS(SELECT 1 FROM sessions
+                              WHERE project_id = p.id AND ended_at IS NULL) AS has_active_session
+                   FROM projects p WHERE p.name = ?""",
+                (cutoff.isoformat(), project_name)
+            ).fetchone()
+            if not project:
+                return None
+            project_id = project["id"]
+            
+            blocking = conn.execute(
+                """SELECT pr.id, substr(pr.title, 1, 60) AS title FROM problems pr
+                   JOIN components c ON pr.component_id = c.id
+                   WHERE c.project_id = ? AND pr.status IN ('open', 'investigating')
+                     AND pr.severity IN ('critical', 'high')
+                   ORDER BY pr.severity = 'critical' DESC, pr.created_at DESC LIMIT 3""",
+                (project_id,)
+            ).fetchall()
+            todos = conn.execute(
+                """SELECT substr(title, 1, 50) AS title FROM todos
+                   WHERE project_id = ? AND status = 'pending'
+                   ORDER BY CASE priority WHEN 'critical' THEN 1 WHEN 'high' THEN 2 WHEN 'medium' THEN 3 ELSE 4 END, created_at DESC
+                   LIMIT 3""",
+                (project_id,)
+            ).fetchall()
+            last_change = conn.execute(
+                """SELECT ch.component_id, ch.field_name FROM changes ch
+                   JOIN components c ON ch.component_id = c.id
+                   WHERE c.project_id = ? AND ch.created_at > ?
+                   ORDER BY ch.created_at DESC LIMIT 1""",
+                (project_id, cutoff.isoformat())
+            ).fetchone()
+            
+            return {
+                "project": dict(project),
+                "blocking": [dict(row) for row in blocking],
+                "todos": [row["title"] for row in todos],
+                "last_change": dict(last_change) if last_change else None
+            }
+        finally:
+            conn.close()
+    
     # ========================================================
     # SEARCH (FTS for now, embeddings later)
     # ========================================================
@@ -939,25 +1428,31 @@ class Database:
         self,
         project_id: int,
         session_id: Optional[str] = None,
-        limit: int = 20
+        limit: int = 20,
+        before_id: Optional[int] = None
     ) -> list[Conversation]:
-        """Get conversation history for a project."""
+        """Get conversation history for a project, newest first.
+        
+        before_id is a keyset cursor: only conversations older than that
+        one (by created_at, then id) are returned.
+        """
+        where = "project_id = ?"
+        params = [project_id]
+        if session_id:
+            where += " AND session_id = ?"
+            params.append(session_id)
+        if before_id is not None:
+            where += " AND (created_at, id) < (SELECT created_at, id FROM conversations WHERE id = ?)"
+            params.append(before_id)
+        params.append(limit)
         conn = self._conn()
         try:
-            if session_id:
-                rows = conn.execute(
-                    """SELECT * FROM conversations 
-                       WHERE project_id = ? AND session_id = ?
-                       ORDER BY created_at DESC LIMIT ?""",
-                    (project_id, session_id, limit)
-                ).fetchall()
-            else:
-                rows = conn.execute(
-                    """SELECT * FROM conversations 
-                       WHERE project_id = ?
-                       ORDER BY created_at DESC LIMIT ?""",
-                    (project_id, limit)
-                ).fetchall()
+            rows = conn.execute(
+                f"""SELECT * FROM conversations 
+                    WHERE {where}
+                    ORDER BY created_at DESC, id DESC LIMIT ?""",
+                params
+            ).fetchall()
             
             result = []
             for row in rows:
@@ -1141,6 +1636,102 @@ class Database:
         finally:
             conn.close()
     
+    def get_project_story_page(
+        self,
+        project_id: int,
+        limit_per_section: int = 200,
+        section_cursors: Optional[dict[str, Optional[int]]] = None
+    ) -> dict:
+        """
+        One page of get_project_story_data, for projects too large to load
+        in one go. Each section holds at most limit_per_section rows.
+        
+        section_cursors maps a section name to the id of the last row
+        already seen. When given, only those sections are fetched (from
+        after their cursor). "next_cursors" in the result has an entry for
+        every section with more rows, so it can be passed straight back.
+        Stats always cover the whole project. limit_per_section is
+        clamped to at least 1.
+        """
+        project = self.get_project(project_id)
+        if not project:
+            return {}
+        
+        limit_per_section = max(1, limit_per_section)
+        if section_cursors is None:
+            section_cursors = dict.fromkeys(_STORY_SECTIONS)
+        conn = self.get_conn()
+        result = {"project": project.model_dump()}
+        next_cursors = {}
+        for name, cursor_id in section_cursors.items():
+            if name not in _STORY_SECTIONS:
+                continue
+            rows = self._story_section_rows(conn, name, project_id, limit_per_section, cursor_id)
+            if len(rows) > limit_per_section:
+                rows = rows[:limit_per_section]
+                next_cursors[name] = rows[-1]['id']
+            result[name] = self._story_section_items(conn, name, rows)
+        
+        stats = dict(conn.execute(_STORY_STATS_SQL, {"project_id": project_id}).fetchone())
+        first_problem_at = stats.pop("first_problem_at")
+        stats["first_activity"] = (
+            min(project.created_at, datetime.fromisoformat(first_problem_at))
+            if first_problem_at else project.created_at
+        )
+        stats["last_activity"] = project.updated_at
+        result["stats"] = stats
+        result["next_cursors"] = next_cursors
+        return result
+    
+    @staticmethod
+    def _story_section_rows(
+        conn: sqlite3.Connection,
+        name: str,
+        project_id: int,
+        limit: int,
+        cursor_id: Optional[int]
+    ) -> list[sqlite3.Row]:
+        """Up to limit + 1 rows of a story section after cursor_id (the +1 flags another page)."""
+        query, table, sort, newest_first = _STORY_SECTIONS[name]
+        direction, compare = ("DESC", "<") if newest_first else ("ASC", ">")
+        params = {"project_id": project_id, "limit": limit + 1}
+        if cursor_id is not None:
+            query += (f" AND (t.{sort}, t.id) {compare} "
+                      f"(SELECT {sort}, id FROM {table} WHERE id = :cursor_id)")
+            params["cursor_id"] = cursor_id
+        query += f" ORDER BY t.{sort} {direction}, t.id {direction} LIMIT :limit"
+        return conn.execute(query, params).fetchall()
+    
+    @staticmethod
+    def _story_section_items(conn: sqlite3.Connection, name: str, rows: list[sqlite3.Row]) -> list[dict]:
+        """Shape a page of section rows like get_project_story_data does."""
+        if name == "components":
+            return [Component(**dict(r)).model_dump() for r in rows]
+        if name == "learnings":
+            return [Learning(**dict(r)).model_dump() for r in rows]
+        if name != "problems":
+            return [dict(r) for r in rows]
+        
+        # Attempts and solutions for the whole page in two queries
+        problems = {r['id']: Problem(**dict(r)).model_dump() for r in rows}
+        for prob in problems.values():
+            prob['attempts'] = []
+            prob['solution'] = None
+        if problems:
+            placeholders = ", ".join("?" * len(problems))
+            ids = tuple(problems)
+            for a in conn.execute(
+                f"""SELECT * FROM solution_attempts WHERE problem_id IN ({placeholders})
+                    ORDER BY created_at, id""",
+                ids
+            ):
+                problems[a['problem_id']]['attempts'].append(SolutionAttempt(**dict(a)).model_dump())
+            for sol in conn.execute(
+                f"SELECT * FROM solutions WHERE problem_id IN ({placeholders})", ids
+            ):
+                problems[sol['problem_id']]['solution'] = Solution(**dict(sol)).model_dump()
+        return list(problems.values())
+    
     def get_problem_journey_data(self, problem_id: int) -> dict:
         """
         Get all data needed to visualize a problem's solution journey.
@@ -1416,39 +2007,35 @@ class Database:
     
     def promote_skills(self, min_sessions: int = 3, min_success_rate: float = 0.8) -> list[dict]:
         """Promote all skills that meet criteria. Returns newly promoted skills."""
-        conn = self._conn()
-        try:
-            # Find skills ready for promotion
-            rows = conn.execute(
-                """SELECT * FROM learned_skills 
-                   WHERE promoted = FALSE
-                   AND session_count >= ?
-                   AND times_applied > 0
-                   AND CAST(times_succeeded AS REAL) / times_applied >= ?""",
-                (min_sessions, min_success_rate)
-            ).fetchall()
-            
-            skill_ids = [r['id'] for r in rows]
-            
-            if skill_ids:
-                placeholders = ','.join('?' * len(skill_ids))
-                conn.execute(
-                    f"""UPDATE learned_skills 
-                       SET promoted = TRUE, promoted_at = CURRENT_TIMESTAMP
-                       WHERE id IN ({placeholders})""",
-                    skill_ids
-                )
-                conn.commit()
-                
-                rows = conn.execute(
-                    f"SELECT * FROM learned_skills WHERE id IN ({placeholders})",
-                    skill_ids
-                ).fetchall()
-            
-            return [dict(r) for r in rows]
-        finally:
-            conn.close()
+        conn = self.get_conn()
+        with conn:
+            return self._promote_ready_skills(conn, min_sessions, min_success_rate)
+    
+    @staticmethod
+    def _promote_ready_skills(
+        conn: sqlite3.Connection,
+        min_sessions: int = 3,
+        min_success_rate: float = 0.8
+    ) -> list[dict]:
+        """
+        Promote skills that meet the criteria, in the caller's transaction.
+        updated_at is set here because RETURNING runs before the
+        updated_at trigger does.
+        """
+        rows = conn.execute(
+            """UPDATE learned_skills 
+               SET promoted = TRUE, promoted_at = CURRENT_TIMESTAMP,
+                   updated_at = CURRENT_TIMESTAMP
+               WHERE promoted = FALSE
+               AND session_count >= ?
+               AND times_applied > 0
+               AND CAST(times_succeeded AS REAL) / times_applied >= ?
+               RETURNING *""",
+            (min_sessions, min_success_rate)
+        ).fetchall()
+        return sorted((dict(r) for r in rows), key=lambda r: r['id'])
     
+
     # -------------------- SESSION STATE --------------------
     
     def save_state(
@@ -1465,35 +2052,50 @@ class Database:
         estimated_tokens: Optional[int] = None
     ) -> dict:
         """Save Claude's session state."""
-        conn = self._conn()
-        try:
-            cursor = conn.execute(
-                """INSERT INTO session_state 
-                   (project_id, state_type, focus_summary, active_problem_ids,
-                    active_component_ids, pending_decisions, key_facts,
-                    previous_state_id, tool_calls_this_session, estimated_tokens)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (project_id, state_type, focus_summary,
-                 json.dumps(active_problem_ids) if active_problem_ids else None,
-                 json.dumps(active_component_ids) if active_component_ids else None,
-                 json.dumps(pending_decisions) if pending_decisions else None,
-                 json.dumps(key_facts) if key_facts else None,
-                 previous_state_id, tool_calls_this_session, estimated_tokens)
+        conn = self.get_conn()
+        with conn:
+            return self._insert_state(
+                conn, project_id, state_type, focus_summary, active_problem_ids,
+                active_component_ids, pending_decisions, key_facts,
+                previous_state_id, tool_calls_this_session, estimated_tokens
             )
-            conn.commit()
-            row = conn.execute(
-                "SELECT * FROM session_state WHERE id = ?",
-                (cursor.lastrowid,)
-            ).fetchone()
-            result = dict(row)
-            # Parse JSON fields
-            for field in ['active_problem_ids', 'active_component_ids', 'pending_decisions', 'key_facts']:
-                if result.get(field):
-                    result[field] = json.loads(result[field])
-            return result
-        finally:
-            conn.close()
     
+    @staticmethod
+    def _insert_state(
+        conn: sqlite3.Connection,
+        project_id: int,
+        state_type: str,
+        focus_summary: Optional[str] = None,
+        active_problem_ids: Optional[list] = None,
+        active_component_ids: Optional[list] = None,
+        pending_decisions: Optional[list] = None,
+        key_facts: Optional[list] = None,
+        previous_state_id: Optional[int] = None,
+        tool_calls_this_session: int = 0,
+        estimated_tokens: Optional[int] = None
+    ) -> dict:
+        """Insert a session_state row in the caller's transaction."""
+        row = conn.execute(
+            """INSERT INTO session_state 
+               (project_id, state_type, focus_summary, active_problem_ids,
+                active_component_ids, pending_decisions, key_facts,
+                previous_state_id, tool_calls_this_session, estimated_tokens)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               RETURNING *""",
+            (project_id, state_type, focus_summary,
+             json.dumps(active_problem_ids) if active_problem_ids else None,
+             json.dumps(active_component_ids) if active_component_ids else None,
+             json.dumps(pending_decisions) if pending_decisions else None,
+             json.dumps(key_facts) if key_facts else None,
+             previous_state_id, tool_calls_this_session, estimated_tokens)
+        ).fetchone()
+        result = dict(row)
+        # Parse JSON fields
+        for field in ['active_problem_ids', 'active_component_ids', 'pending_decisions', 'key_facts']:
+            if result.get(field):
+                result[field] = json.loads(result[field])
+        return result
+
     def get_latest_state(self, project_id: int) -> Optional[dict]:
         """Get the most recent session state for a project."""
         conn = self._conn()
@@ -1582,10 +2184,10 @@ class Database:
                    gotchas = COALESCE(excluded.gotchas, tool_registry.gotchas),
                    pairs_with = COALESCE(excluded.pairs_with, tool_registry.pairs_with)""",
                 (mcp_server, tool_name,
-                 json.dumps(effective_for) if effective_for else None,
-                 json.dumps(common_parameters) if common_parameters else None,
-                 json.dumps(gotchas) if gotchas else None,
-                 json.dumps(pairs_with) if pairs_with else None)
+                 _encode_json(effective_for) if effective_for else None,
+                 _encode_json(common_parameters) if common_parameters else None,
+                 _encode_json(gotchas) if gotchas else None,
+                 _encode_json(pairs_with) if pairs_with else None)
             )
             conn.commit()
             row = conn.execute(
@@ -1711,36 +2313,39 @@ class Database:
         trigger: Optional[str] = None,
         preceding_tool_id: Optional[int] = None
     ) -> dict:
-        """Log a tool usage."""
-        conn = self._conn()
-        try:
-            # Find tool_registry_id
-            reg_row = conn.execute(
-                "SELECT id FROM tool_registry WHERE mcp_server = ? AND tool_name = ?",
-                (mcp_server, tool_name)
-            ).fetchone()
-            tool_registry_id = reg_row['id'] if reg_row else None
-            
-            cursor = conn.execute(
-                """INSERT INTO tool_usage 
-                   (project_id, session_state_id, tool_registry_id, mcp_server, tool_name,
-                    parameters, result_size, execution_time_ms, task_type, trigger, preceding_tool_id)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (project_id, session_state_id, tool_registry_id, mcp_server, tool_name,
-                 json.dumps(parameters) if parameters else None,
-                 result_size, execution_time_ms, task_type, trigger, preceding_tool_id)
-            )
-            conn.commit()
+        """
+        Log a tool usage.
+        Fires on every tool call, so it runs as one statement on this
+        thread's pooled connection: the registry lookup is a subquery and
+        the new row comes back via RETURNING.
+        """
+        conn = self.get_conn()
+        with conn:
             row = conn.execute(
-                "SELECT * FROM tool_usage WHERE id = ?",
-                (cursor.lastrowid,)
+                _INSERT_TOOL_USAGE_SQL + " RETURNING *",
+                _tool_usage_params(mcp_server, tool_name, project_id, session_state_id,
+                                   parameters, result_size, execution_time_ms, task_type,
+                                   trigger, preceding_tool_id)
             ).fetchone()
-            result = dict(row)
-            if result.get('parameters'):
-                result['parameters'] = json.loads(result['parameters'])
-            return result
-        finally:
-            conn.close()
+        return _tool_usage_dict(row)
+    
+    def log_tool_uses(self, usages: list[dict]) -> list[dict]:
+        """
+        Log many tool usages in one transaction (e.g. replaying a session).
+        Each dict takes log_tool_use's keyword arguments.
+        """
+        if not usages:
+            return []
+        params = [_tool_usage_params(**usage) for usage in usages]
+        conn = self.get_conn()
+        with conn:
+            conn.executemany(_INSERT_TOOL_USAGE_SQL, params)
+            # One write transaction, so the new ids are contiguous
+            rows = conn.execute(
+                "SELECT * FROM tool_usage WHERE id > last_insert_rowid() - ? ORDER BY id",
+                (len(params),)
+            ).fetchall()
+        return [_tool_usage_dict(row) for row in rows]
     
     def rate_tool_use(self, usage_id: int, was_useful: bool, user_correction: Optional[str] = None) -> dict:
         """Rate a tool usage as useful or not."""
@@ -1981,25 +2586,33 @@ class Database:
         project_id: Optional[int] = None,
         session_state_id: Optional[int] = None
     ) -> dict:
-        """Log an algorithm metric."""
-        conn = self._conn()
-        try:
-            cursor = conn.execute(
-                """INSERT INTO algorithm_metrics 
-                   (project_id, session_state_id, metric_type, context, action_taken,
-                    outcome, effectiveness_score, user_feedback, should_adjust, suggested_adjustment)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (project_id, session_state_id, metric_type, context, action_taken,
-                 outcome, effectiveness_score, user_feedback, should_adjust, suggested_adjustment)
-            )
-            conn.commit()
+        """Log an algorithm metric (one INSERT ... RETURNING on the pooled connection)."""
+        conn = self.get_conn()
+        with conn:
             row = conn.execute(
-                "SELECT * FROM algorithm_metrics WHERE id = ?",
-                (cursor.lastrowid,)
+                _INSERT_METRIC_SQL + " RETURNING *",
+                _metric_params(metric_type, context, action_taken, outcome, effectiveness_score,
+                               user_feedback, should_adjust, suggested_adjustment,
+                               project_id, session_state_id)
             ).fetchone()
-            return dict(row)
-        finally:
-            conn.close()
+        return dict(row)
+    
+    def log_metrics(self, metrics: list[dict]) -> list[dict]:
+        """
+        Log many algorithm metrics in one transaction.
+        Each dict takes log_metric's keyword arguments.
+        """
+        if not metrics:
+            return []
+        params = [_metric_params(**metric) for metric in metrics]
+        conn = self.get_conn()
+        with conn:
+            conn.executemany(_INSERT_METRIC_SQL, params)
+            rows = conn.execute(
+                "SELECT * FROM algorithm_metrics WHERE id > last_insert_rowid() - ? ORDER BY id",
+                (len(params),)
+            ).fetchall()
+        return [dict(row) for row in rows]
     
     def get_metrics(
         self,
@@ -2069,42 +2682,50 @@ class Database:
         Initialize a v1.3 intelligent session.
         Returns: session state, applicable skills, tool recommendations, active patterns.
         """
-        conn = self._conn()
-        try:
+        conn = self.get_conn()
+        with conn:
+            # Take the write lock up front so the latest state can't change
+            # between reading it and chaining the new state onto it
+            conn.execute("BEGIN IMMEDIATE")
+            
             # Get latest state for this project
-            latest_state = self.get_latest_state(project_id)
-            previous_state_id = latest_state['id'] if latest_state else None
+            latest = conn.execute(
+                """SELECT id FROM session_state 
+                   WHERE project_id = ?
+                   ORDER BY created_at DESC LIMIT 1""",
+                (project_id,)
+            ).fetchone()
+            previous_state_id = latest['id'] if latest else None
             
             # Create new session state
-            state = self.save_state(
+            state = self._insert_state(
+                conn,
                 project_id=project_id,
                 state_type='start',
                 previous_state_id=previous_state_id
             )
-            
-            # Get applicable skills (project-specific + global)
-            skills = self.get_skills(project_id=project_id, min_confidence=0.5)
-            
-            # Get tool recommendations
-            tools = self.get_tools(min_success_rate=0.5)
-            
-            # Get active patterns
-            patterns = self.get_patterns(project_id=project_id, min_confidence=0.5)
-            
-            # Get previous state chain for context
-            state_chain = []
-            if previous_state_id:
-                state_chain = self.get_state_chain(previous_state_id, max_depth=3)
-            
-            return {
-                "session_state": state,
-                "applicable_skills": skills,
-                "tool_recommendations": tools,
-                "active_patterns": patterns,
-                "previous_state_chain": state_chain
-            }
-        finally:
-            conn.close()
+        
+        # Get applicable skills (project-specific + global)
+        skills = self.get_skills(project_id=project_id, min_confidence=0.5)
+        
+        # Get tool recommendations
+        tools = self.get_tools(min_success_rate=0.5)
+        
+        # Get active patterns
+        patterns = self.get_patterns(project_id=project_id, min_confidence=0.5)
+        
+        # Get previous state chain for context
+        state_chain = []
+        if previous_state_id:
+            state_chain = self.get_state_chain(previous_state_id, max_depth=3)
+        
+        return {
+            "session_state": state,
+            "applicable_skills": skills,
+            "tool_recommendations": tools,
+            "active_patterns": patterns,
+            "previous_state_chain": state_chain
+        }
     
     def finalize_session_v13(
         self,
@@ -2120,26 +2741,35 @@ class Database:
         Finalize a v1.3 session with handoff state.
         Creates an 'end' state that can be used to resume next session.
         """
-        # Get the original state
-        original_state = self.restore_state(session_state_id)
-        if not original_state:
-            return {}
-        
-        # Create end/handoff state
-        end_state = self.save_state(
-            project_id=original_state['project_id'],
-            state_type='handoff',
-            focus_summary=focus_summary,
-            active_problem_ids=active_problem_ids,
-            active_component_ids=active_component_ids,
-            pending_decisions=pending_decisions,
-            key_facts=key_facts,
-            previous_state_id=session_state_id,
-            tool_calls_this_session=tool_calls_this_session
-        )
-        
-        # Promote any skills that are ready
-        promoted_skills = self.promote_skills()
+        conn = self.get_conn()
+        with conn:
+            # One write transaction for the handoff state and promotions
+            conn.execute("BEGIN IMMEDIATE")
+            
+            # Get the original state
+            original = conn.execute(
+                "SELECT project_id FROM session_state WHERE id = ?",
+                (session_state_id,)
+            ).fetchone()
+            if not original:
+                return {}
+            
+            # Create end/handoff state
+            end_state = self._insert_state(
+                conn,
+                project_id=original['project_id'],
+                state_type='handoff',
+                focus_summary=focus_summary,
+                active_problem_ids=active_problem_ids,
+                active_component_ids=active_component_ids,
+                pending_decisions=pending_decisions,
+                key_facts=key_facts,
+                previous_state_id=session_state_id,
+                tool_calls_this_session=tool_calls_this_session
+            )
+            
+            # Promote any skills that are ready
+            promoted_skills = self._promote_ready_skills(conn)
         
         return {
             "end_state": end_state,
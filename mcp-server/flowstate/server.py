@@ -315,7 +315,9 @@ TOOLS = [
                 "assistant_response_summary": {"type": "string"},
                 "key_decisions": {"type": "array", "items": {"type": "string"}},
                 # For list:
-                "limit": {"type": "integer", "default": 20}
+                "limit": {"type": "integer", "default": 20},
+                "before_id": {"type": "integer", "description": "Page cursor: id of the last item from the previous page"},
+                "fields": {"type": "array", "items": {"type": "string"}, "description": "Only return these columns"}
             },
             "required": ["action"]
         }
@@ -326,14 +328,16 @@ TOOLS = [
     # ----------------------------------------
     Tool(
         name="file",
-        description="Manage file attachments. Actions: attach, list, remove, search",
+        description="Manage file attachments. Actions: attach, attach_many, list, remove, search",
         inputSchema={
             "type": "object",
             "properties": {
-                "action": {"type": "string", "enum": ["attach", "list", "remove", "search"]},
+                "action": {"type": "string", "enum": ["attach", "attach_many", "list", "remove", "search"]},
                 # For attach:
                 "project_id": {"type": "integer"},
                 "file_path": {"type": "string"},
+                # For attach_many:
+                "file_paths": {"type": "array", "items": {"type": "string"}},
                 "component_id": {"type": "integer"},
                 "problem_id": {"type": "integer"},
                 "user_description": {"type": "string"},
@@ -356,13 +360,19 @@ TOOLS = [
     # ----------------------------------------
     Tool(
         name="git",
-        description="Git operations. Actions: init, status, sync, set_remote, clone, history",
+        description=(
+            "Git operations. Actions: init, status, sync, set_remote, clone, history. "
+            "sync commits locally and, unless wait is true, pulls/pushes in the background: "
+            "it returns pushed='pending' and success covers only the commit - call "
+            "action 'status' and read last_push for the pull/push outcome."
+        ),
         inputSchema={
             "type": "object",
             "properties": {
                 "action": {"type": "string", "enum": ["init", "status", "sync", "set_remote", "clone", "history"]},
                 # For sync:
                 "commit_message": {"type": "string"},
+                "wait": {"type": "boolean", "default": False, "description": "sync: block until pull/push finish and report their result"},
                 # For set_remote/clone:
                 "remote_url": {"type": "string"},
                 "local_path": {"type": "string"},
@@ -670,12 +680,16 @@ async def _route_tool(name: str, args: dict) -> Any:
             return tools.get_conversations(
                 args["project_id"],
                 args.get("session_id"),
-                args.get("limit", 20)
+                args.get("limit", 20),
+                args.get("before_id"),
+                args.get("fields")
             )
         elif action == "list_sessions":
             return tools.get_sessions(
                 args["project_id"],
-                args.get("limit", 20)
+                args.get("limit", 20),
+                args.get("before_id"),
+                args.get("fields")
             )
     
     elif name == "file":
@@ -690,6 +704,15 @@ async def _route_tool(name: str, args: dict) -> Any:
                 args.get("tags"),
                 args.get("copy_to_bundle", True)
             )
+        elif action == "attach_many":
+            return tools.attach_files(
+                args["project_id"],
+                args["file_paths"],
+                args.get("component_id"),
+                args.get("problem_id"),
+                args.get("tags"),
+                args.get("copy_to_bundle", True)
+            )
         elif action == "list":
             return tools.get_attachments(
                 args.get("project_id"),
@@ -716,7 +739,7 @@ async def _route_tool(name: str, args: dict) -> Any:
         elif action == "status":
             return tools.git_status()
         elif action == "sync":
-            return tools.git_sync(args.get("commit_message"))
+            return tools.git_sync(args.get("commit_message"), args.get("wait", False))
         elif action == "set_remote":
             return tools.git_set_remote(args["remote_url"])
         elif action == "clone":
@@ -414,7 +414,8 @@ TOOLS = [
             "properties": {
                 "project_id": {"type": "integer", "description": "Project ID"},
                 "session_id": {"type": "string", "description": "Filter by session"},
-                "limit": {"type": "integer", "description": "Max results (default 20)", "default": 20}
+                "limit": {"type": "integer", "description": "Max results (default 20, capped at 100)", "default": 20},
+                "before_id": {"type": "integer", "description": "Page cursor: id of the last conversation from the previous page"}
             },
             "required": ["project_id"]
         }
@@ -459,7 +460,9 @@ TOOLS = [
         inputSchema={
             "type": "object",
             "properties": {
-                "project_id": {"type": "integer", "description": "Project ID"}
+                "project_id": {"type": "integer", "description": "Project ID"},
+                "limit_per_section": {"type": "integer", "minimum": 1, "description": "Page large projects: max items per section"},
+                "section_cursors": {"type": "object", "description": "next_cursors from the previous page"}
             },
             "required": ["project_id"]
         }
@@ -567,11 +570,17 @@ TOOLS = [
     ),
     Tool(
         name="git_sync",
-        description="Sync FlowState data: add all changes, commit, pull --rebase, push. Full sync in one command.",
+        description=(
+            "Sync FlowState data: add all changes, commit, pull --rebase, push. "
+            "Unless wait is true, pull/push run in the background: the result has "
+            "pushed='pending' and success covers only the local commit - check "
+            "last_push from git_status for the pull/push outcome."
+        ),
         inputSchema={
             "type": "object",
             "properties": {
-                "commit_message": {"type": "string", "description": "Custom commit message (default: timestamp)"}
+                "commit_message": {"type": "string", "description": "Custom commit message (default: timestamp)"},
+                "wait": {"type": "boolean", "default": False, "description": "Block until pull/push finish and report their result"}
             }
         }
     ),
@@ -736,7 +745,9 @@ TOOLS = [
             "properties": {
                 "project_id": {"type": "integer", "description": "Project ID"},
                 "session_id": {"type": "string", "description": "Filter by session"},
-                "limit": {"type": "integer", "description": "Max results (default 50)", "default": 50}
+                "limit": {"type": "integer", "description": "Max results (default 50, capped at 100)", "default": 50},
+                "before_id": {"type": "integer", "description": "Page cursor: id of the last conversation from the previous page"},
+                "fields": {"type": "array", "items": {"type": "string"}, "description": "Only return these columns (id is always included)"}
             },
             "required": ["project_id"]
         }
@@ -748,7 +759,9 @@ TOOLS = [
             "type": "object",
             "properties": {
                 "project_id": {"type": "integer", "description": "Project ID"},
-                "limit": {"type": "integer", "description": "Max results (default 50)", "default": 50}
+                "limit": {"type": "integer", "description": "Max results (default 50, capped at 100)", "default": 50},
+                "before_id": {"type": "integer", "description": "Page cursor: id of the last session from the previous page"},
+                "fields": {"type": "array", "items": {"type": "string"}, "description": "Only return these columns (id is always included)"}
             },
             "required": ["project_id"]
         }
@@ -1,119 +1,95 @@
-"""FlowState tools package - re-exports all tool functions."""
+"""FlowState tools package - re-exports all tool functions.
 
-# Utilities (internal, but exposed for server.py)
-from .utils import get_db, set_db, _compact_dict, _compact_list
+Submodules are imported lazily (PEP 562) on first attribute access, so
+importing the package is cheap and each tool only pays for the modules
+it actually uses.
+"""
 
-# Core project and component tools
-from .core import (
-    list_projects, create_project, get_project, update_project,
-    get_project_context, create_component, list_components, update_component,
-    log_change, get_recent_changes, search, get_component_history,
-    link_items, find_related, get_cross_references,
-    get_project_context_v11, get_project_context_lean
-)
+import importlib
 
-# Problem tracking tools
-from .problems import (
-    log_problem, get_open_problems, log_attempt,
-    mark_attempt_outcome, mark_problem_solved, get_problem_tree
-)
-
-# Session and conversation tools
-from .sessions import (
-    start_session, end_session, get_current_session,
-    log_conversation, get_conversations, get_sessions,
-    get_conversation_history, initialize_session_v13, finalize_session_v13
-)
-
-# Todo tools
-from .todos import add_todo, update_todo, get_todos
-
-# Learning and skill tools
-from .learning import (
-    log_learning, get_learnings, learn_skill, get_skills,
-    apply_skill, confirm_skill, promote_skills,
-    save_state, get_latest_state, get_state_chain, restore_state
-)
-
-# Project variables and methods
-from .variables import (
-    create_project_variable, get_project_variables,
-    update_project_variable, delete_project_variable,
-    create_project_method, get_project_methods,
-    update_project_method, delete_project_method
-)
-
-# File attachment tools
-from .files import (
-    attach_file, get_attachments, remove_attachment, search_file_content
-)
-
-# Git operations
-from .git_ops import (
-    git_init, git_status, git_sync, git_set_remote, git_clone, git_history
-)
-
-# Intelligence layer (v1.3)
-from .intelligence import (
-    register_tool, get_tools, update_tool_stats, get_tool_recommendation,
-    log_tool_use, rate_tool_use, get_usage_patterns,
-    record_pattern, get_patterns, apply_pattern, confirm_pattern,
-    log_metric, get_metrics, get_tuning_suggestions
-)
-
-# Story generation
-from .story import (
-    generate_project_story, generate_problem_journey, generate_architecture_diagram
-)
-
-
-# Define __all__ for explicit exports
-__all__ = [
-    # Utilities
-    'get_db', 'set_db',
+# Exported name -> submodule that defines it
+_SUBMODULE_EXPORTS = {
+    # Utilities (internal, but exposed for server.py)
+    'utils': ('get_db', 'set_db', '_compact_dict', '_compact_list'),
     
-    # Core
-    'list_projects', 'create_project', 'get_project', 'update_project',
-    'get_project_context', 'create_component', 'list_components', 'update_component',
-    'log_change', 'get_recent_changes', 'search', 'get_component_history',
-    'link_items', 'find_related', 'get_cross_references',
-    'get_project_context_v11', 'get_project_context_lean',
+    # Core project and component tools
+    'core': (
+        'list_projects', 'create_project', 'get_project', 'update_project',
+        'get_project_context', 'create_component', 'list_components', 'update_component',
+        'log_change', 'get_recent_changes', 'search', 'get_component_history',
+        'link_items', 'find_related', 'get_cross_references',
+        'get_project_context_v11', 'get_project_context_lean',
+    ),
     
-    # Problems
-    'log_problem', 'get_open_problems', 'log_attempt',
-    'mark_attempt_outcome', 'mark_problem_solved', 'get_problem_tree',
+    # Problem tracking tools
+    'problems': (
+        'log_problem', 'get_open_problems', 'log_attempt',
+        'mark_attempt_outcome', 'mark_problem_solved', 'get_problem_tree',
+    ),
     
-    # Sessions
-    'start_session', 'end_session', 'get_current_session',
-    'log_conversation', 'get_conversations', 'get_sessions',
-    'get_conversation_history', 'initialize_session_v13', 'finalize_session_v13',
+    # Session and conversation tools
+    'sessions': (
+        'start_session', 'end_session', 'get_current_session',
+        'log_conversation', 'get_conversations', 'get_sessions',
+        'get_conversation_history', 'initialize_session_v13', 'finalize_session_v13',
+    ),
     
-    # Todos
-    'add_todo', 'update_todo', 'get_todos',
+    # Todo tools
+    'todos': ('add_todo', 'update_todo', 'get_todos'),
     
-    # Learning
-    'log_learning', 'get_learnings', 'learn_skill', 'get_skills',
-    'apply_skill', 'confirm_skill', 'promote_skills',
-    'save_state', 'get_latest_state', 'get_state_chain', 'restore_state',
+    # Learning and skill tools
+    'learning': (
+        'log_learning', 'get_learnings', 'learn_skill', 'get_skills',
+        'apply_skill', 'confirm_skill', 'promote_skills',
+        'save_state', 'get_latest_state', 'get_state_chain', 'restore_state',
+    ),
     
-    # Variables
-    'create_project_variable', 'get_project_variables',
-    'update_project_variable', 'delete_project_variable',
-    'create_project_method', 'get_project_methods',
-    'update_project_method', 'delete_project_method',
+    # Project variables and methods
+    'variables': (
+        'create_project_variable', 'get_project_variables',
+        'update_project_variable', 'delete_project_variable',
+        'create_project_method', 'get_project_methods',
+        'update_project_method', 'delete_project_method',
+    ),
     
-    # Files
-    'attach_file', 'get_attachments', 'remove_attachment', 'search_file_content',
+    # File attachment tools
+    'files': ('attach_file', 'attach_files', 'get_attachments', 'remove_attachment', 'search_file_content'),
     
-    # Git
-    'git_init', 'git_status', 'git_sync', 'git_set_remote', 'git_clone', 'git_history',
+    # Git operations
+    'git_ops': ('git_init', 'git_status', 'git_sync', 'git_set_remote', 'git_clone', 'git_history'),
     
-    # Intelligence
-    'register_tool', 'get_tools', 'update_tool_stats', 'get_tool_recommendation',
-    'log_tool_use', 'rate_tool_use', 'get_usage_patterns',
-    'record_pattern', 'get_patterns', 'apply_pattern', 'confirm_pattern',
-    'log_metric', 'get_metrics', 'get_tuning_suggestions',
+    # Intelligence layer (v1.3)
+    'intelligence': (
+        'register_tool', 'get_tools', 'update_tool_stats', 'get_tool_recommendation',
+        'log_tool_use', 'log_tool_uses', 'rate_tool_use', 'get_usage_patterns',
+        'record_pattern', 'get_patterns', 'apply_pattern', 'confirm_pattern',
+        'log_metric', 'log_metrics', 'get_metrics', 'get_tuning_suggestions',
+    ),
     
-    # Story
-    'generate_project_story', 'generate_problem_journey', 'generate_architecture_diagram',
-]
+    # Story generation
+    'story': ('generate_project_story', 'generate_problem_journey', 'generate_architecture_diagram'),
+}
+
+_EXPORTS = {
+    name: module
+    for module, names in _SUBMODULE_EXPORTS.items()
+    for name in names
+}
+
+
+def __getattr__(name: str):
+    """Import the defining submodule on first access and cache the attribute."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+# Public exports - every mapped name except the underscore helpers
+__all__ = [name for name in _EXPORTS if not name.startswith('_')]
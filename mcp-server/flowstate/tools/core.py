@@ -1,10 +1,59 @@
 """Core project and component tools."""
 
+import copy
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict
 from typing import Optional, Any
 from datetime import datetime
-from .utils import get_db, _compact_list
+from .utils import get_db, get_conn, _compact_rows, _dump_rows, _fetch_dicts, on_project_write, notify_project_write
 from .files import get_attachments
 
+# Stale-while-revalidate cache for get_project_context_v11:
+# (project_name, hours, include_files) -> (monotonic timestamp, result).
+# Entries younger than the TTL are served as-is; older ones (up to the
+# stale limit) are served once more while a single refresh is queued.
+_CTX_CACHE_TTL = 2.0
+_CTX_CACHE_STALE_LIMIT = 30.0
+_ctx_cache: dict[tuple, tuple[float, dict]] = {}
+_ctx_refreshing: set[tuple] = set()
+# Bumped on every write so an in-flight refresh can't store pre-write data
+_ctx_generation = 0
+_ctx_lock = threading.Lock()
+# One long-lived worker runs the refreshes, so they reuse its connection
+_ctx_refresh_queue: "queue.Queue[tuple[tuple, int]]" = queue.Queue()
+_ctx_worker: Optional[threading.Thread] = None
+
+
+@on_project_write
+def _invalidate_context_cache(project_id: Optional[int] = None) -> None:
+    """Drop cached contexts for a project (or all of them)."""
+    global _ctx_generation
+    with _ctx_lock:
+        _ctx_generation += 1
+        if project_id is None:
+            _ctx_cache.clear()
+            return
+        for key, (_, result) in list(_ctx_cache.items()):
+            if result["project"]["id"] == project_id:
+                del _ctx_cache[key]
+
+
+def _dump_context(ctx) -> dict:
+    """ProjectContext.model_dump() built from the flat rows directly."""
+    return {
+        "project": ctx.project.__dict__.copy(),
+        "components": _dump_rows(ctx.components),
+        "open_problems": _dump_rows(ctx.open_problems),
+        "recent_changes": _dump_rows(ctx.recent_changes),
+        "high_priority_todos": _dump_rows(ctx.high_priority_todos),
+        "recent_learnings": _dump_rows(ctx.recent_learnings),
+        "current_session": ctx.current_session.__dict__.copy() if ctx.current_session else None
+    }
+
+
 def list_projects(status: Optional[str] = None) -> list[dict]:
     """
     List all projects with their status and stats.
@@ -17,7 +66,7 @@ def list_projects(status: Optional[str] = None) -> list[dict]:
     """
     db = get_db()
     projects = db.list_projects(status)
-    return [p.model_dump() for p in projects]
+    return _dump_rows(projects)
 
 
 def create_project(name: str, description: Optional[str] = None) -> dict:
@@ -71,6 +120,7 @@ def update_project(
     """
     db = get_db()
     project = db.update_project(project_id, name=name, description=description, status=status)
+    notify_project_write(project_id)
     return project.model_dump() if project else None
 
 
@@ -96,39 +146,25 @@ def get_project_context(project_name: str, hours: int = 48, include_files: bool
     Returns:
         Full project context or None if project not found
     """
-    db = get_db()
-    ctx = db.get_project_context(project_name, hours)
-    if ctx is None:
-        return None
-    
-    result = {
-        "project": ctx.project.model_dump(),
-        "components": [c.model_dump() for c in ctx.components],
-        "open_problems": [p.model_dump() for p in ctx.open_problems],
-        "recent_changes": [c.model_dump() for c in ctx.recent_changes],
-        "high_priority_todos": [t.model_dump() for t in ctx.high_priority_todos],
-        "recent_learnings": [l.model_dump() for l in ctx.recent_learnings],
-        "current_session": ctx.current_session.model_dump() if ctx.current_session else None
-    }
-    
-    # Add file attachments if requested (v1.1)
-    if include_files:
-        attachments = get_attachments(project_id=ctx.project.id)
-        result["attachments"] = attachments
-        
-        # Get content locations for attachments
-        conn = db._conn()
-        try:
-            for att in attachments:
-                locations = conn.execute(
-                    "SELECT * FROM content_locations WHERE attachment_id = ?",
-                    (att['id'],)
-                ).fetchall()
-                att['content_locations'] = [dict(l) for l in locations]
-        finally:
-            conn.close()
+    return _build_project_context(project_name, hours, include_files)
+
+
+def _attach_content_locations(project_id: int, attachments: list[dict]) -> None:
+    """Fill in att['content_locations'] for a project's attachments with one query."""
+    if not attachments:
+        return
+    locations = _fetch_dicts(get_conn().execute(
+        """SELECT cl.* FROM content_locations cl
+           JOIN attachments a ON a.id = cl.attachment_id
+           WHERE a.project_id = ?""",
+        (project_id,)
+    ))
     
-    return result
+    locations_by_attachment = defaultdict(list)
+    for location in locations:
+        locations_by_attachment[location['attachment_id']].append(location)
+    for att in attachments:
+        att['content_locations'] = locations_by_attachment[att['id']]
 
 
 def create_component(
@@ -151,6 +187,7 @@ def create_component(
     """
     db = get_db()
     component = db.create_component(project_id, name, description, parent_component_id)
+    notify_project_write(project_id)
     return component.model_dump()
 
 
@@ -166,7 +203,7 @@ def list_components(project_id: int) -> list[dict]:
     """
     db = get_db()
     components = db.list_components(project_id)
-    return [c.model_dump() for c in components]
+    return _dump_rows(components)
 
 
 def update_component(
@@ -189,6 +226,7 @@ def update_component(
     """
     db = get_db()
     component = db.update_component(component_id, name=name, description=description, status=status)
+    notify_project_write(component.project_id if component else None)
     return component.model_dump() if component else None
 
 
@@ -215,13 +253,11 @@ def log_change(
         The logged change
     """
     db = get_db()
-    change = db.log_change(component_id, field_name, old_value, new_value, change_type, reason)
-    
-    # Index for search
-    search_text = f"{field_name} {old_value or ''} {new_value or ''} {reason or ''}"
-    component = db.get_component(component_id)
-    if component:
-        db.index_for_search("change", change.id, component.project_id, search_text)
+    # One insert; the changes_search_index trigger indexes it for search
+    change, project_id = db.log_change_and_index(
+        component_id, field_name, old_value, new_value, change_type, reason
+    )
+    notify_project_write(project_id)
     
     return change.model_dump()
 
@@ -246,8 +282,7 @@ def get_recent_changes(
     """
     db = get_db()
     changes = db.get_recent_changes(project_id, component_id, hours)
-    result = [c.model_dump() for c in changes]
-    return _compact_list(result) if compact else result
+    return _compact_rows(changes) if compact else _dump_rows(changes)
 
 
 def search(
@@ -319,10 +354,14 @@ def link_items(
     db = get_db()
     
     # Auto-detect project IDs if not provided
-    if source_project_id is None:
-        source_project_id = _get_project_id_for_item(db, source_type, source_id)
-    if target_project_id is None:
-        target_project_id = _get_project_id_for_item(db, target_type, target_id)
+    if source_project_id is None and target_project_id is None:
+        source_project_id, target_project_id = _get_project_ids_for_items(
+            [(source_type, source_id), (target_type, target_id)]
+        )
+    elif source_project_id is None:
+        source_project_id, = _get_project_ids_for_items([(source_type, source_id)])
+    elif target_project_id is None:
+        target_project_id, = _get_project_ids_for_items([(target_type, target_id)])
     
     return db.link_items(
         source_project_id, source_type, source_id,
@@ -331,32 +370,36 @@ def link_items(
     )
 
 
-def _get_project_id_for_item(db, item_type: str, item_id: int) -> int:
-    """Helper to get project_id for any item type."""
-    if item_type == 'component':
-        comp = db.get_component(item_id)
-        return comp.project_id if comp else 0
-    elif item_type == 'problem':
-        prob = db.get_problem(item_id)
-        if prob:
-            comp = db.get_component(prob.component_id)
-            return comp.project_id if comp else 0
-    elif item_type == 'solution':
-        sol = db.get_solution(item_id)
-        if sol:
-            prob = db.get_problem(sol.problem_id)
-            if prob:
-                comp = db.get_component(prob.component_id)
-                return comp.project_id if comp else 0
-    elif item_type == 'learning':
-        learnings = db.get_learnings()
-        for l in learnings:
-            if l.id == item_id:
-                return l.project_id
-    elif item_type == 'change':
-        # Need to trace through component
-        pass
-    return 0
+# project_id lookup per linkable item type, each taking the item id
+_PROJECT_ID_SQL = {
+    'component': "SELECT project_id FROM components WHERE id = ?",
+    'problem': """SELECT c.project_id FROM problems p
+                  JOIN components c ON c.id = p.component_id WHERE p.id = ?""",
+    'solution': """SELECT c.project_id FROM solutions s
+                   JOIN problems p ON p.id = s.problem_id
+                   JOIN components c ON c.id = p.component_id WHERE s.id = ?""",
+    'learning': "SELECT project_id FROM learnings WHERE id = ?",
+    'change': """SELECT c.project_id FROM changes ch
+                 JOIN components c ON c.id = ch.component_id WHERE ch.id = ?""",
+}
+
+
+def _get_project_ids_for_items(items: list[tuple[str, int]]) -> list[int]:
+    """
+    Helper to get project_id for (item_type, item_id) pairs in one query.
+    Unknown types and missing items map to 0.
+    """
+    columns = []
+    params = []
+    for item_type, item_id in items:
+        sql = _PROJECT_ID_SQL.get(item_type)
+        if sql is None:
+            columns.append("0")
+        else:
+            columns.append(f"COALESCE(({sql}), 0)")
+            params.append(item_id)
+    row = get_conn().execute(f"SELECT {', '.join(columns)}", params).fetchone()
+    return list(row)
 
 
 def find_related(
@@ -377,6 +420,33 @@ def find_related(
     return db.find_related(item_type, item_id)
 
 
+# Columns returned by get_cross_references
+_XREF_COLUMNS = (
+    "id, source_project_id, source_type, source_id, target_project_id, "
+    "target_type, target_id, relationship, notes, created_at"
+)
+
+
+def _xref_sql(by_project: bool, by_source_type: bool, by_source_id: bool) -> str:
+    """Build the get_cross_references query for one combination of filters."""
+    query = f"SELECT {_XREF_COLUMNS} FROM cross_references WHERE 1=1"
+    if by_project:
+        query += " AND (source_project_id = ? OR target_project_id = ?)"
+    if by_source_type:
+        query += " AND source_type = ?"
+    if by_source_id:
+        query += " AND source_id = ?"
+    return query + " ORDER BY created_at DESC"
+
+
+# One fixed SQL string per combination of get_cross_references filters:
+# (project?, source_type?, source_id?) -> sql
+_XREF_SQL = {
+    (p, t, i): _xref_sql(p, t, i)
+    for p in (False, True) for t in (False, True) for i in (False, True)
+}
+
+
 def get_cross_references(
     project_id: Optional[int] = None,
     source_type: Optional[str] = None,
@@ -393,26 +463,10 @@ def get_cross_references(
     Returns:
         List of cross-references
     """
-    db = get_db()
-    conn = db._conn()
-    try:
-        query = "SELECT * FROM cross_references WHERE 1=1"
-        params = []
-        if project_id:
-            query += " AND (source_project_id = ? OR target_project_id = ?)"
-            params.extend([project_id, project_id])
-        if source_type:
-            query += " AND source_type = ?"
-            params.append(source_type)
-        if source_id:
-            query += " AND source_id = ?"
-            params.append(source_id)
-        query += " ORDER BY created_at DESC"
-        
-        rows = conn.execute(query, params).fetchall()
-        return [dict(r) for r in rows]
-    finally:
-        conn.close()
+    sql = _XREF_SQL[(bool(project_id), bool(source_type), bool(source_id))]
+    params = [project_id, project_id] if project_id else []
+    params += [value for value in (source_type, source_id) if value]
+    return _fetch_dicts(get_conn().execute(sql, params))
 
 
 def get_project_context_v11(
@@ -434,6 +488,10 @@ def get_project_context_v11(
     - Current session if any
     - File attachments with key locations (NEW in v1.1)
     
+    Results are cached briefly and revalidated in the background; writes
+    made through the tools invalidate the cache for their project. Each
+    call gets its own copy of the result.
+    
     Args:
         project_name: Name of the project
         hours: How many hours back to look for changes (default 48)
@@ -442,37 +500,92 @@ def get_project_context_v11(
     Returns:
         Full project context or None if project not found
     """
+    key = (project_name, hours, include_files)
+    with _ctx_lock:
+        entry = _ctx_cache.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < _CTX_CACHE_STALE_LIMIT:
+                # Stale: serve it once more and refresh in the background
+                if age >= _CTX_CACHE_TTL and key not in _ctx_refreshing:
+                    _queue_context_refresh(key, _ctx_generation)
+                cached = entry[1]
+            else:
+                cached = None
+        else:
+            cached = None
+        generation = _ctx_generation
+    if cached is not None:
+        # Callers may modify their result; the cached one must stay intact
+        return copy.deepcopy(cached)
+    
+    result = _build_project_context(project_name, hours, include_files)
+    _store_project_context(key, generation, result)
+    return copy.deepcopy(result)
+
+
+def _store_project_context(key: tuple, generation: int, result: Optional[dict]) -> None:
+    """Cache a freshly built context unless a write happened while building it."""
+    if result is None:
+        return
+    with _ctx_lock:
+        if generation == _ctx_generation:
+            _ctx_cache[key] = (time.monotonic(), result)
+
+
+def _queue_context_refresh(key: tuple, generation: int) -> None:
+    """Queue a background refresh for key (caller holds _ctx_lock)."""
+    global _ctx_worker
+    _ctx_refreshing.add(key)
+    _ctx_refresh_queue.put((key, generation))
+    if _ctx_worker is None or not _ctx_worker.is_alive():
+        _ctx_worker = threading.Thread(
+            target=_context_refresh_loop,
+            name="flowstate-context-refresh",
+            daemon=True
+        )
+        _ctx_worker.start()
+
+
+def _context_refresh_loop() -> None:
+    """Worker thread: rebuild queued contexts one at a time."""
+    while True:
+        key, generation = _ctx_refresh_queue.get()
+        try:
+            _revalidate_project_context(key, generation)
+        except sqlite3.Error:
+            # Busy or locked DB: the next stale hit queues another try
+            pass
+
+
+def _revalidate_project_context(key: tuple, generation: int) -> None:
+    """Background refresh for a cached context."""
+    try:
+        _store_project_context(key, generation, _build_project_context(*key))
+    finally:
+        with _ctx_lock:
+            _ctx_refreshing.discard(key)
+
+
+def _build_project_context(
+    project_name: str,
+    hours: int,
+    include_files: bool
+) -> Optional[dict]:
+    """Uncached context build shared by get_project_context and get_project_context_v11."""
     db = get_db()
     ctx = db.get_project_context(project_name, hours)
     if ctx is None:
         return None
     
-    result = {
-        "project": ctx.project.model_dump(),
-        "components": [c.model_dump() for c in ctx.components],
-        "open_problems": [p.model_dump() for p in ctx.open_problems],
-        "recent_changes": [c.model_dump() for c in ctx.recent_changes],
-        "high_priority_todos": [t.model_dump() for t in ctx.high_priority_todos],
-        "recent_learnings": [l.model_dump() for l in ctx.recent_learnings],
-        "current_session": ctx.current_session.model_dump() if ctx.current_session else None
-    }
+    result = _dump_context(ctx)
     
     # Add file attachments if requested (v1.1)
     if include_files:
         attachments = get_attachments(project_id=ctx.project.id)
         result["attachments"] = attachments
         
-        # Get content locations for attachments
-        conn = db._conn()
-        try:
-            for att in attachments:
-                locations = conn.execute(
-                    "SELECT * FROM content_locations WHERE attachment_id = ?",
-                    (att['id'],)
-                ).fetchall()
-                att['content_locations'] = [dict(l) for l in locations]
-        finally:
-            conn.close()
+        _attach_content_locations(ctx.project.id, attachments)
     
     return result
 
@@ -501,46 +614,34 @@ def get_project_context_lean(
         - quick_todos: up to 3 pending todo titles
     """
     db = get_db()
-    ctx = db.get_project_context(project_name, hours)
-    if ctx is None:
+    # Counts and previews come straight from SQL - no full lists or models
+    lean = db.get_project_context_lean(project_name, hours)
+    if lean is None:
         return None
     
-    # Build lean response
-    project = ctx.project
-    
-    # Get blocking items (high/critical open problems)
-    blocking = [
-        {"id": p.id, "title": p.title[:60]}
-        for p in ctx.open_problems 
-        if p.severity in ('critical', 'high')
-    ][:3]
-    
-    # Get top 3 pending todos (title only)
-    quick_todos = [
-        t.title[:50] for t in ctx.high_priority_todos[:3]
-    ]
+    project = lean["project"]
     
     # Get recent focus from changes
     recent_focus = None
-    if ctx.recent_changes:
-        last_change = ctx.recent_changes[0]
-        recent_focus = f"Component {last_change.component_id}: {last_change.field_name}"
+    if lean["last_change"]:
+        last_change = lean["last_change"]
+        recent_focus = f"Component {last_change['component_id']}: {last_change['field_name']}"
     
     return {
         "project": {
-            "id": project.id,
-            "name": project.name,
-            "status": project.status
+            "id": project["id"],
+            "name": project["name"],
+            "status": project["status"]
         },
         "stats": {
-            "components": len(ctx.components),
-            "open_problems": len(ctx.open_problems),
-            "pending_todos": len(ctx.high_priority_todos),
-            "recent_changes": len(ctx.recent_changes),
-            "learnings": len(ctx.recent_learnings)
+            "components": project["components"],
+            "open_problems": project["open_problems"],
+            "pending_todos": project["pending_todos"],
+            "recent_changes": project["recent_changes"],
+            "learnings": project["learnings"]
         },
-        "blocking": blocking,
-        "quick_todos": quick_todos,
+        "blocking": lean["blocking"],
+        "quick_todos": lean["todos"],
         "recent_focus": recent_focus,
-        "has_active_session": ctx.current_session is not None
+        "has_active_session": bool(project["has_active_session"])
     }
@@ -3,11 +3,23 @@
 import os
 import shutil
 import hashlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
-from .utils import get_db, FLOWSTATE_DATA_DIR
+from .utils import get_db, get_conn, _fetch_dicts, FLOWSTATE_DATA_DIR, notify_project_write
 
+try:
+    import fcntl  # Unix only
+except ImportError:
+    fcntl = None
+
+# Linux ioctl that clones a file's extents (reflink) on CoW filesystems
+_FICLONE = 0x40049409
+
+
+@functools.lru_cache(maxsize=256)
 def _get_project_bundle_path(project_name: str) -> Path:
     """Get the path to a project's bundle directory."""
     return FLOWSTATE_DATA_DIR / "projects" / f"{project_name.lower().replace(' ', '-')}.flowstate"
@@ -15,24 +27,89 @@ def _get_project_bundle_path(project_name: str) -> Path:
 
 def _compute_file_hash(file_path: Path) -> str:
     """Compute SHA256 hash of a file."""
-    sha256 = hashlib.sha256()
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            sha256.update(chunk)
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+# File extension -> type category
+_EXT_TYPE = (
+    {ext: 'document' for ext in ('.pdf', '.doc', '.docx', '.txt', '.md', '.rtf')}
+    | {ext: 'image' for ext in ('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp')}
+    | {ext: 'code' for ext in ('.py', '.js', '.ts', '.swift', '.rs', '.go', '.java', '.c',
+                               '.cpp', '.h', '.jsx', '.tsx', '.css', '.html')}
+)
+
+
+def _copy_and_hash(src: Path, dst: Path) -> str:
+    """
+    Copy src to dst with metadata (like shutil.copy2) and return the SHA256
+    of its contents, reading the data only once. On CoW filesystems (btrfs,
+    XFS) the copy is a reflink that shares extents, so only the hash reads;
+    otherwise each chunk read is fed to both the hash and dst.
+    """
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as s, open(dst, "wb") as d:
+                fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+            shutil.copystat(src, dst)
+            return _compute_file_hash(src)
+        except OSError:
+            pass
+    
+    sha256 = hashlib.sha256()
+    buf = bytearray(1 << 20)
+    view = memoryview(buf)
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        while n := s.readinto(buf):
+            sha256.update(view[:n])
+            d.write(view[:n])
+    shutil.copystat(src, dst)
     return sha256.hexdigest()
 
 
 def _get_file_type(file_path: Path) -> str:
     """Determine file type category from extension."""
-    ext = file_path.suffix.lower()
-    if ext in ['.pdf', '.doc', '.docx', '.txt', '.md', '.rtf']:
-        return 'document'
-    elif ext in ['.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp']:
-        return 'image'
-    elif ext in ['.py', '.js', '.ts', '.swift', '.rs', '.go', '.java', '.c', '.cpp', '.h', '.jsx', '.tsx', '.css', '.html']:
-        return 'code'
+    return _EXT_TYPE.get(file_path.suffix.lower(), 'other')
+
+
+_INSERT_ATTACHMENT_SQL = """INSERT INTO attachments 
+    (project_id, component_id, problem_id, file_name, file_path, 
+     file_type, file_size, file_hash, is_external, user_description, tags)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+
+def _reserve_bundle_path(attachments_dir: Path, source_path: Path, reserved: set[Path]) -> Path:
+    """Pick a free destination for source_path, adding _1, _2... on name collision."""
+    dest_path = attachments_dir / source_path.name
+    counter = 1
+    while dest_path.exists() or dest_path in reserved:
+        dest_path = attachments_dir / f"{source_path.stem}_{counter}{source_path.suffix}"
+        counter += 1
+    reserved.add(dest_path)
+    return dest_path
+
+
+def _store_attachment(source_path: Path, dest_path: Optional[Path], bundle_path: Path) -> tuple:
+    """
+    Hash a file and copy it to dest_path in the bundle (None = keep it external).
+    Returns (file_name, file_path, file_type, file_size, file_hash, is_external).
+    """
+    if dest_path is not None:
+        file_hash = _copy_and_hash(source_path, dest_path)
+        stored_path = str(dest_path.relative_to(bundle_path))
+        is_external = False
     else:
-        return 'other'
+        file_hash = _compute_file_hash(source_path)
+        stored_path = str(source_path.absolute())
+        is_external = True
+    return (
+        source_path.name,
+        stored_path,
+        source_path.suffix.lstrip('.').lower(),
+        source_path.stat().st_size,
+        file_hash,
+        is_external
+    )
 
 
 def attach_file(
@@ -70,54 +147,130 @@ def attach_file(
     if not project:
         raise ValueError(f"Project not found: {project_id}")
     
-    # Compute file metadata
-    file_name = source_path.name
-    file_type = source_path.suffix.lstrip('.').lower()
-    file_size = source_path.stat().st_size
-    file_hash = _compute_file_hash(source_path)
-    
-    # Determine storage path
+    # Copy to the bundle (or reference in place) and compute file metadata
+    bundle_path = _get_project_bundle_path(project.name)
+    dest_path = None
     if copy_to_bundle:
-        bundle_path = _get_project_bundle_path(project.name)
         attachments_dir = bundle_path / "attachments"
         attachments_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Copy file to bundle
-        dest_path = attachments_dir / file_name
-        # Handle name collision
-        counter = 1
-        while dest_path.exists():
-            stem = source_path.stem
-            dest_path = attachments_dir / f"{stem}_{counter}{source_path.suffix}"
-            counter += 1
-        
-        shutil.copy2(source_path, dest_path)
-        stored_path = str(dest_path.relative_to(bundle_path))
-        is_external = False
-    else:
-        stored_path = str(source_path.absolute())
-        is_external = True
+        dest_path = _reserve_bundle_path(attachments_dir, source_path, set())
+    file_name, stored_path, file_type, file_size, file_hash, is_external = _store_attachment(
+        source_path, dest_path, bundle_path
+    )
     
     # Insert into database
-    conn = db._conn()
-    try:
+    conn = get_conn()
+    with conn:
         cursor = conn.execute(
-            """INSERT INTO attachments 
-               (project_id, component_id, problem_id, file_name, file_path, 
-                file_type, file_size, file_hash, is_external, user_description, tags)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            _INSERT_ATTACHMENT_SQL,
             (project_id, component_id, problem_id, file_name, stored_path,
              file_type, file_size, file_hash, is_external, user_description,
              ','.join(tags) if tags else None)
         )
-        conn.commit()
-        attachment_id = cursor.lastrowid
+    attachment_id = cursor.lastrowid
+    notify_project_write(project_id)
+    
+    # Fetch and return the created attachment
+    row = conn.execute("SELECT * FROM attachments WHERE id = ?", (attachment_id,)).fetchone()
+    return dict(row) if row else {"id": attachment_id}
+
+
+def attach_files(
+    project_id: int,
+    file_paths: list[str],
+    component_id: Optional[int] = None,
+    problem_id: Optional[int] = None,
+    tags: Optional[list[str]] = None,
+    copy_to_bundle: bool = True
+) -> list[dict]:
+    """
+    Attach several files at once.
+    
+    Files are hashed/copied in parallel and inserted in a single transaction.
+    
+    Args:
+        project_id: Which project to attach to
+        file_paths: Paths of the files to attach
+        component_id: Optional component to attach them to
+        problem_id: Optional problem to attach them to
+        tags: Optional list of tags applied to every file
+        copy_to_bundle: If True, copy files to project bundle; else reference external paths
+    
+    Returns:
+        The created attachment records, in file_paths order
+    """
+    db = get_db()
+    source_paths = [Path(p) for p in file_paths]
+    if not source_paths:
+        return []
+    
+    missing = [str(p) for p in source_paths if not p.exists()]
+    if missing:
+        raise FileNotFoundError(f"File not found: {', '.join(missing)}")
+    
+    project = db.get_project(project_id)
+    if not project:
+        raise ValueError(f"Project not found: {project_id}")
+    
+    # Reserve bundle names up front so parallel copies can't collide
+    bundle_path = _get_project_bundle_path(project.name)
+    if copy_to_bundle:
+        attachments_dir = bundle_path / "attachments"
+        attachments_dir.mkdir(parents=True, exist_ok=True)
+        reserved = set()
+        dest_paths = [_reserve_bundle_path(attachments_dir, p, reserved) for p in source_paths]
+    else:
+        dest_paths = [None] * len(source_paths)
+    
+    tags_value = ','.join(tags) if tags else None
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            stored = list(executor.map(
+                lambda src, dest: _store_attachment(src, dest, bundle_path),
+                source_paths, dest_paths
+            ))
         
-        # Fetch and return the created attachment
-        row = conn.execute("SELECT * FROM attachments WHERE id = ?", (attachment_id,)).fetchone()
-        return dict(row) if row else {"id": attachment_id}
-    finally:
-        conn.close()
+        conn = get_conn()
+        with conn:
+            conn.executemany(
+                _INSERT_ATTACHMENT_SQL,
+                [(project_id, component_id, problem_id, *meta, None, tags_value) for meta in stored]
+            )
+            # AUTOINCREMENT ids within one write transaction are consecutive
+            attachments = _fetch_dicts(conn.execute(
+                "SELECT * FROM attachments WHERE id > last_insert_rowid() - ? ORDER BY id",
+                (len(stored),)
+            ))
+    except BaseException:
+        # Nothing was recorded - don't leave the copies that did finish behind
+        for dest_path in dest_paths:
+            if dest_path is not None:
+                dest_path.unlink(missing_ok=True)
+        raise
+    notify_project_write(project_id)
+    
+    return attachments
+
+
+def _attachments_sql(by_project: bool, by_component: bool, by_problem: bool) -> str:
+    """Build the get_attachments query for one combination of filters."""
+    conditions = [
+        condition for condition, used in (
+            ("project_id = ?", by_project),
+            ("component_id = ?", by_component),
+            ("problem_id = ?", by_problem),
+        ) if used
+    ]
+    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    return f"SELECT * FROM attachments WHERE {where_clause} ORDER BY created_at DESC"
+
+
+# One fixed SQL string per combination of get_attachments filters, so the
+# statement cache always hits: (project?, component?, problem?) -> sql
+_ATTACHMENTS_SQL = {
+    (p, c, pr): _attachments_sql(p, c, pr)
+    for p in (False, True) for c in (False, True) for pr in (False, True)
+}
 
 
 def get_attachments(
@@ -136,30 +289,9 @@ def get_attachments(
     Returns:
         List of attachment records
     """
-    db = get_db()
-    conn = db._conn()
-    try:
-        conditions = []
-        params = []
-        
-        if project_id is not None:
-            conditions.append("project_id = ?")
-            params.append(project_id)
-        if component_id is not None:
-            conditions.append("component_id = ?")
-            params.append(component_id)
-        if problem_id is not None:
-            conditions.append("problem_id = ?")
-            params.append(problem_id)
-        
-        where_clause = " AND ".join(conditions) if conditions else "1=1"
-        rows = conn.execute(
-            f"SELECT * FROM attachments WHERE {where_clause} ORDER BY created_at DESC",
-            params
-        ).fetchall()
-        return [dict(row) for row in rows]
-    finally:
-        conn.close()
+    sql = _ATTACHMENTS_SQL[(project_id is not None, component_id is not None, problem_id is not None)]
+    params = [p for p in (project_id, component_id, problem_id) if p is not None]
+    return _fetch_dicts(get_conn().execute(sql, params))
 
 
 def remove_attachment(
@@ -177,31 +309,30 @@ def remove_attachment(
         Success status and info
     """
     db = get_db()
-    conn = db._conn()
-    try:
-        # Get attachment first
-        row = conn.execute("SELECT * FROM attachments WHERE id = ?", (attachment_id,)).fetchone()
-        if not row:
-            return {"success": False, "error": "Attachment not found"}
-        
-        attachment = dict(row)
-        
-        # Delete file if requested and not external
-        if delete_file and not attachment['is_external']:
-            project = db.get_project(attachment['project_id'])
-            if project:
-                bundle_path = _get_project_bundle_path(project.name)
-                file_path = bundle_path / attachment['file_path']
-                if file_path.exists():
-                    os.remove(file_path)
-        
-        # Delete from database
+    conn = get_conn()
+    
+    # Get attachment first
+    row = conn.execute("SELECT * FROM attachments WHERE id = ?", (attachment_id,)).fetchone()
+    if not row:
+        return {"success": False, "error": "Attachment not found"}
+    
+    attachment = dict(row)
+    
+    # Delete file if requested and not external
+    if delete_file and not attachment['is_external']:
+        project = db.get_project(attachment['project_id'])
+        if project:
+            bundle_path = _get_project_bundle_path(project.name)
+            file_path = bundle_path / attachment['file_path']
+            if file_path.exists():
+                os.remove(file_path)
+    
+    # Delete from database
+    with conn:
         conn.execute("DELETE FROM attachments WHERE id = ?", (attachment_id,))
-        conn.commit()
-        
-        return {"success": True, "deleted_attachment": attachment}
-    finally:
-        conn.close()
+    notify_project_write(attachment['project_id'])
+    
+    return {"success": True, "deleted_attachment": attachment}
 
 
 def search_file_content(
@@ -222,31 +353,33 @@ def search_file_content(
     Returns:
         List of matching content locations with file info
     """
-    db = get_db()
-    conn = db._conn()
-    try:
-        # Build query
-        sql = """
-            SELECT cl.*, a.file_name, a.file_path, a.file_type, a.project_id
-            FROM content_locations cl
-            JOIN attachments a ON cl.attachment_id = a.id
-            WHERE cl.description LIKE ? OR cl.snippet LIKE ?
-        """
-        params = [f"%{query}%", f"%{query}%"]
-        
-        if project_id is not None:
-            sql += " AND a.project_id = ?"
-            params.append(project_id)
-        
-        if file_types:
-            placeholders = ",".join(["?"] * len(file_types))
-            sql += f" AND a.file_type IN ({placeholders})"
-            params.extend(file_types)
-        
-        sql += f" ORDER BY cl.created_at DESC LIMIT ?"
-        params.append(limit)
-        
-        rows = conn.execute(sql, params).fetchall()
-        return [dict(row) for row in rows]
-    finally:
-        conn.close()
+    # Every word must appear, each as a word prefix ("config" finds
+    # "configuration"); quotes escaped so any input is a valid MATCH
+    terms = query.split()
+    if not terms:
+        return []
+    match = " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+    
+    # Best match first
+    sql = """
+        SELECT cl.*, a.file_name, a.file_path, a.file_type, a.project_id
+        FROM content_locations_fts f
+        JOIN content_locations cl ON cl.id = f.rowid
+        JOIN attachments a ON cl.attachment_id = a.id
+        WHERE content_locations_fts MATCH ?
+    """
+    params = [match]
+    
+    if project_id is not None:
+        sql += " AND a.project_id = ?"
+        params.append(project_id)
+    
+    if file_types:
+        placeholders = ",".join(["?"] * len(file_types))
+        sql += f" AND a.file_type IN ({placeholders})"
+        params.extend(file_types)
+    
+    sql += " ORDER BY f.rank LIMIT ?"
+    params.append(limit)
+    
+    return _fetch_dicts(get_conn().execute(sql, params))
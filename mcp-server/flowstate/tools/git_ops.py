@@ -1,14 +1,167 @@
 """Git operations tools."""
 
+import functools
+import os
+import re
+import selectors
+import shutil
+import signal
 import subprocess
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
-from datetime import datetime
-from .utils import get_db, FLOWSTATE_DATA_DIR
+from typing import Iterator, Optional
+from datetime import datetime, timedelta, timezone
+from .utils import get_db, _fmt_now, FLOWSTATE_DATA_DIR, notify_project_write
+
+# Optional import - answer read-only queries in-process via libgit2
+try:
+    import pygit2
+    PYGIT2_AVAILABLE = True
+except ImportError:
+    PYGIT2_AVAILABLE = False
+    pygit2 = None
+
+# `git log` records for git_history and git_status - NUL can't occur in any field
+_LOG_FORMAT = "--format=%H%x00%s%x00%ai%x00%an"
+
+# Name and URL columns of `git remote -v`
+_REMOTE_RE = re.compile(r"^(\S+)\t(\S+)", re.M)
+
+# Shared pool for overlapping git_sync phases (network fetch vs local commit)
+_sync_executor = ThreadPoolExecutor(
+    max_workers=max(1, (os.cpu_count() or 4) * 3 // 4),
+    thread_name_prefix="git-sync"
+)
+
+# The remote half of git_sync (rebase onto the fetched branch, push) runs
+# here after the local commit lands; one worker keeps syncs in order
+_remote_sync_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="git-push")
+_last_remote_sync: Optional[Future] = None
+# How long git_sync waits on an earlier sync's pull/push before giving up
+_REMOTE_SYNC_TIMEOUT = 60.0
+
+# Data directory -> its .git directory, once found. Only positive lookups
+# are remembered because the GUI can `git init` the same directory.
+_git_dir_cache: dict[Path, Path] = {}
+
+# Parsed remotes keyed on .git/config path -> (mtime_ns, {name: url})
+_remote_url_cache: dict[Path, tuple[int, dict[str, str]]] = {}
+
+_GITIGNORE_BYTES = b"""# OS files
+.DS_Store
+Thumbs.db
+
+# SQLite temporary/lock files (both .db and .sqlite extensions)
+*.db-journal
+*.db-wal
+*.db-shm
+*.sqlite-journal
+*.sqlite-wal
+*.sqlite-shm
+*.tmp
+*.bak
+
+# Local backups (don't sync conflict backups)
+*.local-backup-*
+
+# Large media (optional - user can toggle)
+# *.mp4
+# *.mov
+"""
+
+_README_BYTES = b"""# FlowState Data
+
+This repository contains your FlowState development memory.
+
+**Do not manually edit these files.**
+
+Manage through the FlowState app or MCP server.
+"""
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    """Create or truncate path and write data as-is (no text encoding or newline translation)."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+@functools.lru_cache(maxsize=1)
+def _git_executable() -> Optional[str]:
+    """Absolute path of the git binary, for os.posix_spawn (None if not on PATH)."""
+    return shutil.which("git")
+
+
+def _spawn_git(git: str, args: list[str], cwd: Path, timeout: float) -> tuple[bool, str, str]:
+    """
+    Run git through os.posix_spawn, reading stdout/stderr until EOF.
+    Skips the pre-exec setup subprocess does (cwd change, fd sweep, error
+    pipe) - roughly a third off the cost of short queries. stdin is
+    /dev/null so git can never read the server's own stdin.
+    """
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    try:
+        pid = os.posix_spawn(
+            git,
+            ["git", "-C", str(cwd)] + args,
+            os.environ,
+            file_actions=[
+                (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+                (os.POSIX_SPAWN_DUP2, out_w, 1),
+                (os.POSIX_SPAWN_DUP2, err_w, 2),
+            ]
+        )
+    except OSError:
+        os.close(out_r)
+        os.close(err_r)
+        raise
+    finally:
+        os.close(out_w)
+        os.close(err_w)
+    
+    chunks = {out_r: [], err_r: []}
+    deadline = time.monotonic() + timeout
+    timed_out = False
+    with selectors.DefaultSelector() as selector:
+        selector.register(out_r, selectors.EVENT_READ)
+        selector.register(err_r, selectors.EVENT_READ)
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            events = selector.select(remaining) if remaining > 0 else []
+            if not events:
+                timed_out = True
+                os.kill(pid, signal.SIGKILL)
+                break
+            for key, _ in events:
+                data = os.read(key.fd, 65536)
+                if data:
+                    chunks[key.fd].append(data)
+                else:
+                    selector.unregister(key.fd)
+    os.close(out_r)
+    os.close(err_r)
+    _, wait_status = os.waitpid(pid, 0)
+    
+    if timed_out:
+        return False, "", "Git command timed out"
+    stdout = b"".join(chunks[out_r]).decode(errors="replace")
+    stderr = b"".join(chunks[err_r]).decode(errors="replace")
+    return os.waitstatus_to_exitcode(wait_status) == 0, stdout, stderr
+
 
 def _run_git_command(args: list[str], cwd: Optional[Path] = None) -> tuple[bool, str, str]:
     """Run a git command and return (success, stdout, stderr)."""
     try:
+        git = _git_executable() if hasattr(os, "posix_spawn") else None
+        if git is not None:
+            return _spawn_git(git, args, cwd or FLOWSTATE_DATA_DIR, timeout=60)
+        
         result = subprocess.run(
             ["git"] + args,
             cwd=cwd or FLOWSTATE_DATA_DIR,
@@ -23,6 +176,167 @@ def _run_git_command(args: list[str], cwd: Optional[Path] = None) -> tuple[bool,
         return False, "", str(e)
 
 
+
+def _stream_git_lines(args: list[str]) -> Iterator[str]:
+    """Yield a git command's stdout line by line as it is produced (errors yield nothing)."""
+    try:
+        proc = subprocess.Popen(
+            ["git"] + args,
+            cwd=FLOWSTATE_DATA_DIR,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            encoding="utf-8",
+            errors="replace"
+        )
+    except OSError:
+        return
+    try:
+        yield from proc.stdout
+    finally:
+        proc.stdout.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+
+def _git_dir() -> Optional[Path]:
+    """The data directory's .git dir, or None if it isn't a repository yet."""
+    git_dir = _git_dir_cache.get(FLOWSTATE_DATA_DIR)
+    if git_dir is None:
+        candidate = FLOWSTATE_DATA_DIR / ".git"
+        if not candidate.exists():
+            return None
+        git_dir = _git_dir_cache[FLOWSTATE_DATA_DIR] = candidate
+    return git_dir
+
+
+def _remember_git_dir(data_dir: Path) -> None:
+    """Record a repository we just created so the next lookup skips the stat."""
+    _git_dir_cache[data_dir] = data_dir / ".git"
+
+
+def _get_remote_urls() -> dict[str, str]:
+    """Remote name -> fetch URL from `git remote -v`, cached until .git/config changes."""
+    config_path = _git_dir() / "config"
+    try:
+        mtime = config_path.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    
+    cached = _remote_url_cache.get(config_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    
+    success, stdout, _ = _run_git_command(["remote", "-v"])
+    remotes = {}
+    if success:
+        # Each remote is listed twice (fetch, then push) - keep the first
+        for name, url in _REMOTE_RE.findall(stdout):
+            remotes.setdefault(name, url)
+    if mtime is not None:
+        _remote_url_cache[config_path] = (mtime, remotes)
+    return remotes
+
+
+def _get_remote_url() -> Optional[str]:
+    """URL of the first remote listed by `git remote -v`, if any."""
+    return next(iter(_get_remote_urls().values()), None)
+
+
+def _porcelain_status() -> dict:
+    """
+    Branch and working tree state from one `git status --porcelain=v2 --branch`.
+    
+    Returns:
+        Dict with branch ("" when detached, "unknown" if git failed),
+        pending_changes and has_untracked
+    """
+    success, stdout, _ = _run_git_command(["status", "--porcelain=v2", "--branch"])
+    branch = "unknown"
+    pending_changes = 0
+    has_untracked = False
+    if success:
+        # Header lines come first; only they are walked one by one
+        entries_start = 0
+        while stdout.startswith("#", entries_start):
+            line_end = stdout.index("\n", entries_start)
+            if stdout.startswith("# branch.head ", entries_start):
+                branch = stdout[entries_start + 14:line_end]
+                if branch == "(detached)":
+                    branch = ""
+            entries_start = line_end + 1
+        # Every entry line is newline-terminated, so count them in C
+        pending_changes = stdout.count("\n", entries_start)
+        has_untracked = stdout.startswith("? ", entries_start) or "\n? " in stdout
+    return {"branch": branch, "pending_changes": pending_changes, "has_untracked": has_untracked}
+
+
+def _open_repo() -> Optional["pygit2.Repository"]:
+    """Open a per-call libgit2 handle on the data directory (None if unavailable)."""
+    if not PYGIT2_AVAILABLE:
+        return None
+    try:
+        return pygit2.Repository(str(FLOWSTATE_DATA_DIR))
+    except (pygit2.GitError, KeyError):
+        return None
+
+
+def _format_date(timestamp: int, offset_minutes: int) -> str:
+    """Format a commit timestamp like git's %ai."""
+    tz = timezone(timedelta(minutes=offset_minutes))
+    return datetime.fromtimestamp(timestamp, tz).strftime("%Y-%m-%d %H:%M:%S %z")
+
+
+def _format_subject(message: str) -> str:
+    """First paragraph of a commit message joined onto one line, like git's %s."""
+    paragraph = message.lstrip("\n").split("\n\n", 1)[0]
+    return " ".join(line.rstrip() for line in paragraph.splitlines())
+
+
+def _commit_date(commit: "pygit2.Commit") -> str:
+    """Format a commit's author date like git's %ai."""
+    return _format_date(commit.author.time, commit.author.offset)
+
+
+def _commit_subject(commit: "pygit2.Commit") -> str:
+    """Subject of a commit message, like git's %s."""
+    return _format_subject(commit.message)
+
+
+def _git_status_inprocess(repo: "pygit2.Repository") -> dict:
+    """git_status via libgit2 - no subprocesses."""
+    if repo.head_is_unborn:
+        branch = repo.references["HEAD"].target.removeprefix("refs/heads/")
+    elif repo.head_is_detached:
+        branch = ""
+    else:
+        branch = repo.head.shorthand
+    
+    remotes = sorted(repo.remotes, key=lambda r: r.name)
+    remote_url = remotes[0].url if remotes else None
+    
+    pending_changes = len(repo.status(untracked_files="normal"))
+    
+    last_commit = None
+    if not repo.head_is_unborn:
+        commit = repo.head.peel(pygit2.Commit)
+        last_commit = {
+            "hash": str(commit.id)[:8],
+            "message": _commit_subject(commit),
+            "date": _commit_date(commit)
+        }
+    
+    return {
+        "initialized": True,
+        "has_remote": bool(remotes),
+        "remote_url": remote_url,
+        "branch": branch,
+        "pending_changes": pending_changes,
+        "last_commit": last_commit,
+        "last_push": _last_push_status()
+    }
+
+
 def git_init() -> dict:
     """
     Initialize FlowState data directory as a Git repository.
@@ -37,51 +351,25 @@ def git_init() -> dict:
     projects_dir.mkdir(exist_ok=True)
     
     # Check if already initialized
-    git_dir = FLOWSTATE_DATA_DIR / ".git"
-    if git_dir.exists():
+    if _git_dir() is not None:
         return git_status()
     
-    # Initialize git
-    success, stdout, stderr = _run_git_command(["init"])
+    # Run `git init` and write .gitignore/README concurrently - the data
+    # directory already exists, so none of these depend on each other.
+    # Leaving the executor block waits for all three.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        init_future = executor.submit(_run_git_command, ["init"])
+        write_futures = [
+            executor.submit(_write_file, FLOWSTATE_DATA_DIR / ".gitignore", _GITIGNORE_BYTES),
+            executor.submit(_write_file, FLOWSTATE_DATA_DIR / "README.md", _README_BYTES),
+        ]
+    
+    success, stdout, stderr = init_future.result()
     if not success:
         return {"success": False, "error": stderr}
-    
-    # Create .gitignore
-    gitignore_content = """# OS files
-.DS_Store
-Thumbs.db
-
-# SQLite temporary/lock files (both .db and .sqlite extensions)
-*.db-journal
-*.db-wal
-*.db-shm
-*.sqlite-journal
-*.sqlite-wal
-*.sqlite-shm
-*.tmp
-*.bak
-
-# Local backups (don't sync conflict backups)
-*.local-backup-*
-
-# Large media (optional - user can toggle)
-# *.mp4
-# *.mov
-"""
-    gitignore_path = FLOWSTATE_DATA_DIR / ".gitignore"
-    gitignore_path.write_text(gitignore_content)
-    
-    # Create README
-    readme_content = """# FlowState Data
-
-This repository contains your FlowState development memory.
-
-**Do not manually edit these files.**
-
-Manage through the FlowState app or MCP server.
-"""
-    readme_path = FLOWSTATE_DATA_DIR / "README.md"
-    readme_path.write_text(readme_content)
+    _remember_git_dir(FLOWSTATE_DATA_DIR)
+    for future in write_futures:
+        future.result()
     
     # Initial commit
     _run_git_command(["add", "."])
@@ -97,8 +385,7 @@ def git_status() -> dict:
     Returns:
         Git status with pending changes, remote, branch info
     """
-    git_dir = FLOWSTATE_DATA_DIR / ".git"
-    if not git_dir.exists():
+    if _git_dir() is None:
         return {
             "initialized": False,
             "has_remote": False,
@@ -107,108 +394,185 @@ def git_status() -> dict:
             "error": "Not a git repository. Run git_init first."
         }
     
-    # Get branch
-    success, stdout, _ = _run_git_command(["branch", "--show-current"])
-    branch = stdout.strip() if success else "unknown"
+    repo = _open_repo()
+    if repo is not None:
+        return _git_status_inprocess(repo)
     
-    # Get remote
-    success, stdout, _ = _run_git_command(["remote", "-v"])
-    has_remote = bool(stdout.strip())
-    remote_url = None
-    if has_remote:
-        lines = stdout.strip().split("\n")
-        if lines:
-            parts = lines[0].split()
-            if len(parts) >= 2:
-                remote_url = parts[1]
+    # Branch and pending changes in one call
+    status = _porcelain_status()
     
-    # Get status (pending changes)
-    success, stdout, _ = _run_git_command(["status", "--porcelain"])
-    pending_changes = len(stdout.strip().split("\n")) if stdout.strip() else 0
+    # Get remote
+    remote_url = _get_remote_url()
+    has_remote = remote_url is not None
     
     # Get last commit info
-    success, stdout, _ = _run_git_command(["log", "-1", "--format=%H|%s|%ai"])
+    success, stdout, _ = _run_git_command(["log", "-1", _LOG_FORMAT])
     last_commit = None
     if success and stdout.strip():
-        parts = stdout.strip().split("|")
-        if len(parts) >= 3:
-            last_commit = {
-                "hash": parts[0][:8],
-                "message": parts[1],
-                "date": parts[2]
-            }
+        full_hash, message, date, _ = stdout.strip("\n").split("\x00")
+        last_commit = {
+            "hash": full_hash[:8],
+            "message": message,
+            "date": date
+        }
     
     return {
         "initialized": True,
         "has_remote": has_remote,
         "remote_url": remote_url,
-        "branch": branch,
-        "pending_changes": pending_changes,
-        "last_commit": last_commit
+        "branch": status["branch"],
+        "pending_changes": status["pending_changes"],
+        "last_commit": last_commit,
+        "last_push": _last_push_status()
     }
 
 
-def git_sync(commit_message: Optional[str] = None) -> dict:
+def git_sync(commit_message: Optional[str] = None, wait: bool = False) -> dict:
     """
     Perform full sync: add all, commit, pull --rebase, push.
     
+    By default returns once the local commit lands: pull and push finish
+    in the background, "pushed" is the string "pending", and "success"
+    only covers the local commit. Their outcome is reported as last_push
+    by git_status(). With wait=True it blocks until pull and push are
+    done and reports them like a synchronous sync ("pushed": True, or
+    "success": False with the failing "step"). A sync started while the
+    previous one's pull/push is still running waits for it up to 60
+    seconds, then fails with step "previous_sync".
+    
     Args:
         commit_message: Custom commit message (default: timestamp)
+        wait: Block (up to 60 seconds) until pull/push finish and report
+              their outcome
     
     Returns:
         Sync result with status info
     """
-    git_dir = FLOWSTATE_DATA_DIR / ".git"
-    if not git_dir.exists():
+    global _last_remote_sync
+    
+    if _git_dir() is None:
         return {"success": False, "error": "Not a git repository. Run git_init first."}
     
-    # Check for remote
-    status = git_status()
+    # Let the previous sync's pull/push finish before touching the repo
+    if _last_remote_sync is not None:
+        try:
+            _last_remote_sync.result(timeout=_REMOTE_SYNC_TIMEOUT)
+        except TimeoutError:
+            return {
+                "success": False,
+                "step": "previous_sync",
+                "error": "Previous sync is still running (pull/push). Try again later."
+            }
     
-    # Add all changes
-    success, stdout, stderr = _run_git_command(["add", "."])
-    if not success:
-        return {"success": False, "step": "add", "error": stderr}
+    # Remote lookup runs alongside the WAL checkpoint, which flushes the
+    # database so the committed file is current (*.db-wal isn't tracked)
+    remote_future = _sync_executor.submit(_get_remote_urls)
+    if not get_db().checkpoint():
+        return {
+            "success": False,
+            "step": "checkpoint",
+            "error": "Database is busy (another reader, e.g. the GUI) - flowstate.db "
+                     "would be committed without its latest changes. Try again."
+        }
+    # Pull and push target origin, so that is the remote that matters
+    has_remote = "origin" in remote_future.result()
     
-    # Check if there's anything to commit
-    success, stdout, _ = _run_git_command(["status", "--porcelain"])
-    has_changes = bool(stdout.strip())
+    # One status call (after the checkpoint) gives the branch and what
+    # there is to commit
+    status = _porcelain_status()
+    branch = status["branch"]
+    
+    # Start fetching while the local commit is made; only the rebase onto
+    # the fetched branch and the push need to wait for it
+    fetch_future = None
+    if has_remote:
+        fetch_future = _sync_executor.submit(_run_git_command, ["fetch", "origin", branch])
+    
+    has_changes = status["pending_changes"] > 0
     
-    # Commit if there are changes
     if has_changes:
-        msg = commit_message or f"FlowState sync - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        success, stdout, stderr = _run_git_command(["commit", "-m", msg])
+        # `commit -a` stages tracked changes itself; only new files (e.g.
+        # fresh attachments) need a separate add
+        if status["has_untracked"]:
+            success, stdout, stderr = _run_git_command(["add", "."])
+            if not success:
+                return {"success": False, "step": "add", "error": stderr}
+        
+        msg = commit_message or f"FlowState sync - {_fmt_now()}"
+        success, stdout, stderr = _run_git_command(["commit", "-a", "-m", msg])
         if not success:
             return {"success": False, "step": "commit", "error": stderr}
     
-    # Pull and push if remote exists
-    if status.get("has_remote"):
-        # Pull with rebase
-        success, stdout, stderr = _run_git_command(["pull", "--rebase", "origin", status.get("branch", "main")])
-        if not success and "Could not resolve host" not in stderr:
-            # Might be a conflict - save local backup
-            backup_time = datetime.now().strftime("%Y%m%d%H%M%S")
+    # Pull and push in the background if remote exists; the outcome is
+    # reported by git_status() as last_push
+    if fetch_future is not None:
+        _last_remote_sync = _remote_sync_executor.submit(_finish_remote_sync, fetch_future, branch)
+        if wait:
+            try:
+                remote_result = _last_remote_sync.result(timeout=_REMOTE_SYNC_TIMEOUT)
+            except TimeoutError:
+                # Still going - report it like a non-waiting sync
+                return {
+                    "success": True,
+                    "committed": has_changes,
+                    "pushed": "pending",
+                    "message": commit_message or "FlowState sync"
+                }
+            if not remote_result["success"]:
+                return remote_result
             return {
-                "success": False, 
-                "step": "pull", 
-                "error": stderr,
-                "conflict": True,
-                "backup_hint": f"Local changes may need manual resolution"
+                "success": True,
+                "committed": has_changes,
+                "pushed": True,
+                "message": commit_message or "FlowState sync"
             }
-        
-        # Push
-        success, stdout, stderr = _run_git_command(["push", "origin", status.get("branch", "main")])
-        if not success and "Could not resolve host" not in stderr:
-            return {"success": False, "step": "push", "error": stderr}
     
     return {
         "success": True,
         "committed": has_changes,
-        "pushed": status.get("has_remote", False),
+        "pushed": "pending" if has_remote else False,
         "message": commit_message or "FlowState sync"
     }
 
 
+def _finish_remote_sync(fetch_future: Future, branch: str) -> dict:
+    """Rebase onto the fetched branch and push (git_sync's network half)."""
+    # Pull with rebase: rebase onto what the fetch brought in
+    success, stdout, stderr = fetch_future.result()
+    if success:
+        success, stdout, stderr = _run_git_command(["rebase", "FETCH_HEAD"])
+        if success:
+            # The rebase may have checked out a new flowstate.db: reopen the
+            # pooled connections and drop anything cached from the old file
+            get_db().reset_connections()
+            notify_project_write()
+    if not success and "Could not resolve host" not in stderr:
+        # Might be a conflict - leave local changes for manual resolution
+        return {
+            "success": False, 
+            "step": "pull", 
+            "error": stderr,
+            "conflict": True,
+            "backup_hint": f"Local changes may need manual resolution"
+        }
+    
+    # Push
+    success, stdout, stderr = _run_git_command(["push", "origin", branch])
+    if not success and "Could not resolve host" not in stderr:
+        return {"success": False, "step": "push", "error": stderr}
+    
+    return {"success": True}
+
+
+def _last_push_status():
+    """Result of the last background pull/push: None, "pending" or a result dict."""
+    if _last_remote_sync is None:
+        return None
+    if not _last_remote_sync.done():
+        return "pending"
+    return _last_remote_sync.result()
+
+
 def git_set_remote(remote_url: str) -> dict:
     """
     Add or update the remote URL.
@@ -219,13 +583,15 @@ def git_set_remote(remote_url: str) -> dict:
     Returns:
         Status info
     """
-    git_dir = FLOWSTATE_DATA_DIR / ".git"
-    if not git_dir.exists():
+    if _git_dir() is None:
         return {"success": False, "error": "Not a git repository. Run git_init first."}
     
     # Check if remote exists
-    success, stdout, _ = _run_git_command(["remote", "-v"])
-    has_origin = "origin" in stdout
+    repo = _open_repo()
+    if repo is not None:
+        has_origin = "origin" in repo.remotes.names()
+    else:
+        has_origin = "origin" in _get_remote_urls()
     
     if has_origin:
         # Update existing remote
@@ -267,6 +633,7 @@ def git_clone(remote_url: str, local_path: Optional[str] = None) -> dict:
     if not success:
         return {"success": False, "error": stderr}
     
+    _remember_git_dir(target_path)
     return {"success": True, "path": str(target_path), "remote_url": remote_url}
 
 
@@ -280,27 +647,35 @@ def git_history(limit: int = 20) -> list[dict]:
     Returns:
         List of commit records
     """
-    git_dir = FLOWSTATE_DATA_DIR / ".git"
-    if not git_dir.exists():
+    if _git_dir() is None:
         return []
     
-    success, stdout, _ = _run_git_command([
-        "log", f"-{limit}", "--format=%H|%s|%ai|%an"
-    ])
-    
-    if not success or not stdout.strip():
-        return []
-    
-    commits = []
-    for line in stdout.strip().split("\n"):
-        parts = line.split("|")
-        if len(parts) >= 4:
+    repo = _open_repo()
+    if repo is not None:
+        if repo.head_is_unborn:
+            return []
+        commits = []
+        for commit in repo.walk(repo.head.target, pygit2.GIT_SORT_TIME):
+            if len(commits) >= limit:
+                break
+            full_hash = str(commit.id)
             commits.append({
-                "hash": parts[0][:8],
-                "full_hash": parts[0],
-                "message": parts[1],
-                "date": parts[2],
-                "author": parts[3]
+                "hash": full_hash[:8],
+                "full_hash": full_hash,
+                "message": _commit_subject(commit),
+                "date": _commit_date(commit),
+                "author": commit.author.name
             })
+        return commits
     
+    commits = []
+    for line in _stream_git_lines(["log", f"-{limit}", _LOG_FORMAT]):
+        full_hash, message, date, author = line.rstrip("\n").split("\x00")
+        commits.append({
+            "hash": full_hash[:8],
+            "full_hash": full_hash,
+            "message": message,
+            "date": date,
+            "author": author
+        })
     return commits
@@ -1,8 +1,8 @@
 """Intelligence layer tools (v1.3) - tool tracking, patterns, metrics."""
 
+from __future__ import annotations
+
 from typing import Optional
-import json
-from datetime import datetime
 from .utils import get_db
 
 def register_tool(
@@ -137,6 +137,20 @@ def log_tool_use(
     )
 
 
+def log_tool_uses(usages: list[dict]) -> list[dict]:
+    """
+    Log many tool usages at once (e.g. importing or replaying a session).
+    
+    Args:
+        usages: One dict per usage, with log_tool_use's arguments
+    
+    Returns:
+        The tool usage records, in the order given
+    """
+    db = get_db()
+    return db.log_tool_uses(usages)
+
+
 def rate_tool_use(usage_id: int, was_useful: bool, user_correction: str = None) -> dict:
     """
     Rate a tool usage as useful or not.
@@ -333,6 +347,20 @@ def log_metric(
     )
 
 
+def log_metrics(metrics: list[dict]) -> list[dict]:
+    """
+    Log many algorithm metrics at once.
+    
+    Args:
+        metrics: One dict per metric, with log_metric's arguments
+    
+    Returns:
+        The created metric records, in the order given
+    """
+    db = get_db()
+    return db.log_metrics(metrics)
+
+
 def get_metrics(
     project_id: int = None,
     metric_type: str = None,
@@ -1,9 +1,9 @@
 """Learning and skill tracking tools."""
 
+from __future__ import annotations
+
 from typing import Optional
-import json
-from datetime import datetime
-from .utils import get_db, _compact_list
+from .utils import get_db, _dump_rows, notify_project_write
 
 def log_learning(
     project_id: int,
@@ -28,11 +28,9 @@ def log_learning(
         The logged learning
     """
     db = get_db()
+    # Indexed for search by the learnings_search_index trigger
     learning = db.log_learning(project_id, insight, category, context, component_id, source)
-    
-    # Index for search
-    search_text = f"{insight} {context or ''} {category or ''}"
-    db.index_for_search("learning", learning.id, project_id, search_text)
+    notify_project_write(project_id)
     
     return learning.model_dump()
 
@@ -56,9 +54,9 @@ def get_learnings(
         List of learnings
     """
     db = get_db()
-    learnings = db.get_learnings(project_id, category, verified_only)
-    result = [l.model_dump() for l in learnings]
-    return _compact_list(result) if compact else result
+    if compact:
+        return db.get_learnings_compact(project_id, category, verified_only)
+    return _dump_rows(db.get_learnings(project_id, category, verified_only))
 
 
 def learn_skill(
@@ -1,7 +1,7 @@
 """Problem tracking and solution tools."""
 
 from typing import Optional
-from .utils import get_db, _compact_list
+from .utils import get_db, _compact_rows, _dump_rows, notify_project_write
 
 def log_problem(
     component_id: int,
@@ -22,13 +22,9 @@ def log_problem(
         The logged problem
     """
     db = get_db()
-    problem = db.log_problem(component_id, title, description, severity)
-    
-    # Index for search
-    search_text = f"{title} {description or ''}"
-    component = db.get_component(component_id)
-    if component:
-        db.index_for_search("problem", problem.id, component.project_id, search_text)
+    # Indexed for search by the problems_search_index trigger
+    problem, project_id = db.log_problem_with_project(component_id, title, description, severity)
+    notify_project_write(project_id)
     
     return problem.model_dump()
 
@@ -51,8 +47,7 @@ def get_open_problems(
     """
     db = get_db()
     problems = db.get_open_problems(project_id, component_id)
-    result = [p.model_dump() for p in problems]
-    return _compact_list(result) if compact else result
+    return _compact_rows(problems) if compact else _dump_rows(problems)
 
 
 def log_attempt(
@@ -120,14 +115,11 @@ def mark_problem_solved(
         The solution record
     """
     db = get_db()
-    solution = db.mark_problem_solved(problem_id, winning_attempt_id, summary, key_insight, code_snippet)
-    
-    # Index for search
-    problem = db.get_problem(problem_id)
-    component = db.get_component(problem.component_id) if problem else None
-    if component:
-        search_text = f"{summary} {key_insight or ''}"
-        db.index_for_search("solution", solution.id, component.project_id, search_text)
+    # Indexed for search by the solutions_search_index trigger
+    solution, project_id = db.mark_problem_solved_with_project(
+        problem_id, winning_attempt_id, summary, key_insight, code_snippet
+    )
+    notify_project_write(project_id)
     
     return solution.model_dump()
 
@@ -143,15 +135,12 @@ def get_problem_tree(problem_id: int) -> dict:
         Problem with all attempts and solution if solved
     """
     db = get_db()
-    problem = db.get_problem(problem_id)
+    problem, attempts, solution = db.get_problem_tree_bundle(problem_id)
     if not problem:
         return {}
     
-    attempts = db.get_attempts_for_problem(problem_id)
-    solution = db.get_solution(problem_id)
-    
     return {
         "problem": problem.model_dump(),
-        "attempts": [a.model_dump() for a in attempts],
+        "attempts": _dump_rows(attempts),
         "solution": solution.model_dump() if solution else None
     }
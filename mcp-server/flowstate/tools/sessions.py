@@ -1,8 +1,67 @@
 """Session and conversation management tools."""
 
 from typing import Optional
-import json
-from .utils import get_db
+from .utils import get_db, get_conn, _dump_rows, _loads, notify_project_write
+
+# Upper bound on one page of conversations/sessions
+_MAX_PAGE_SIZE = 100
+
+
+# Columns returned by get_conversations / get_sessions, in table order.
+# Rows are zipped against these instead of dict(row), which looks every
+# key up by name.
+_CONVERSATION_COLUMNS = (
+    "id", "project_id", "session_id", "user_prompt_summary",
+    "assistant_response_summary", "key_decisions", "problems_referenced",
+    "solutions_created", "tokens_used", "created_at",
+)
+_SESSION_COLUMNS = (
+    "id", "project_id", "started_at", "ended_at", "focus_component_id",
+    "focus_problem_id", "summary", "outcomes", "duration_minutes",
+)
+
+
+def _page_limit(limit: int) -> int:
+    """Clamp a caller-supplied page size to 1.._MAX_PAGE_SIZE."""
+    return min(max(1, limit), _MAX_PAGE_SIZE)
+
+
+def _select_columns(columns: tuple, fields: Optional[list[str]]) -> list[str]:
+    """Columns to select: all of them, or the requested subset (id always kept)."""
+    if not fields:
+        return list(columns)
+    wanted = set(fields)
+    wanted.add("id")
+    return [c for c in columns if c in wanted]
+
+
+def _conversations_sql(columns: list[str], by_session: bool, paged: bool) -> str:
+    """Build the get_conversations query for a column list and filters."""
+    query = f"SELECT {', '.join(columns)} FROM conversations WHERE project_id = ?"
+    if by_session:
+        query += " AND session_id = ?"
+    if paged:
+        query += " AND (created_at, id) < (SELECT created_at, id FROM conversations WHERE id = ?)"
+    return query + " ORDER BY created_at DESC, id DESC LIMIT ?"
+
+
+def _sessions_sql(columns: list[str], paged: bool) -> str:
+    """Build the get_sessions query for a column list and cursor."""
+    query = f"SELECT {', '.join(columns)} FROM sessions WHERE project_id = ?"
+    if paged:
+        query += " AND (started_at, id) < (SELECT started_at, id FROM sessions WHERE id = ?)"
+    return query + " ORDER BY started_at DESC, id DESC LIMIT ?"
+
+
+# Fixed SQL strings for the all-columns case, so repeat calls reuse the
+# same text (and the connection's cached prepared statement):
+# (session filter?, cursor?) -> sql, and cursor? -> sql
+_CONVERSATIONS_SQL = {
+    (s, p): _conversations_sql(list(_CONVERSATION_COLUMNS), s, p)
+    for s in (False, True) for p in (False, True)
+}
+_SESSIONS_SQL = {p: _sessions_sql(list(_SESSION_COLUMNS), p) for p in (False, True)}
+
 
 def start_session(
     project_id: int,
@@ -22,6 +81,7 @@ def start_session(
     """
     db = get_db()
     session = db.start_session(project_id, focus_component_id, focus_problem_id)
+    notify_project_write(project_id)
     return session.model_dump()
 
 
@@ -43,6 +103,7 @@ def end_session(
     """
     db = get_db()
     session = db.end_session(session_id, summary, outcomes)
+    notify_project_write(session.project_id if session else None)
     return session.model_dump() if session else None
 
 
@@ -95,93 +156,101 @@ def log_conversation(
 def get_conversations(
     project_id: int,
     session_id: Optional[str] = None,
-    limit: int = 50
+    limit: int = 50,
+    before_id: Optional[int] = None,
+    fields: Optional[list[str]] = None
 ) -> list[dict]:
     """
-    Get conversations for a project.
+    Get conversations for a project, newest first.
     
     Args:
         project_id: The project ID
         session_id: Optional filter by session
-        limit: Max results (default 50)
+        limit: Max results (default 50, capped at 100)
+        before_id: Pagination cursor - pass the id of the last conversation
+                   from the previous page to get the next (older) page
+        fields: Optional subset of columns to return (id is always included);
+                unknown names are ignored
     
     Returns:
         List of conversations
     """
-    import json
-    db = get_db()
-    conn = db._conn()
-    try:
-        if session_id:
-            rows = conn.execute(
-                """SELECT * FROM conversations 
-                   WHERE project_id = ? AND session_id = ? 
-                   ORDER BY created_at DESC LIMIT ?""",
-                (project_id, session_id, limit)
-            ).fetchall()
-        else:
-            rows = conn.execute(
-                """SELECT * FROM conversations 
-                   WHERE project_id = ? 
-                   ORDER BY created_at DESC LIMIT ?""",
-                (project_id, limit)
-            ).fetchall()
-        results = []
-        for r in rows:
-            d = dict(r)
-            if d.get('key_decisions'):
-                try:
-                    d['key_decisions'] = json.loads(d['key_decisions'])
-                except:
-                    pass
-            results.append(d)
-        return results
-    finally:
-        conn.close()
+    by_session = bool(session_id)
+    paged = before_id is not None
+    if fields:
+        columns = _select_columns(_CONVERSATION_COLUMNS, fields)
+        sql = _conversations_sql(columns, by_session, paged)
+    else:
+        columns = _CONVERSATION_COLUMNS
+        sql = _CONVERSATIONS_SQL[(by_session, paged)]
+    params = [project_id]
+    if by_session:
+        params.append(session_id)
+    if paged:
+        params.append(before_id)
+    params.append(_page_limit(limit))
+    rows = get_conn().execute(sql, params).fetchall()
+    results = []
+    for r in rows:
+        d = dict(zip(columns, r))
+        if d.get('key_decisions'):
+            try:
+                d['key_decisions'] = _loads(d['key_decisions'])
+            except:
+                pass
+        results.append(d)
+    return results
 
 
 def get_sessions(
     project_id: int,
-    limit: int = 50
+    limit: int = 50,
+    before_id: Optional[int] = None,
+    fields: Optional[list[str]] = None
 ) -> list[dict]:
     """
-    Get work sessions for a project.
+    Get work sessions for a project, newest first.
     
     Args:
         project_id: The project ID
-        limit: Max results (default 50)
+        limit: Max results (default 50, capped at 100)
+        before_id: Pagination cursor - pass the id of the last session
+                   from the previous page to get the next (older) page
+        fields: Optional subset of columns to return (id is always included);
+                unknown names are ignored
     
     Returns:
         List of sessions
     """
-    import json
-    db = get_db()
-    conn = db._conn()
-    try:
-        rows = conn.execute(
-            """SELECT * FROM sessions 
-               WHERE project_id = ? 
-               ORDER BY started_at DESC LIMIT ?""",
-            (project_id, limit)
-        ).fetchall()
-        results = []
-        for r in rows:
-            d = dict(r)
-            if d.get('outcomes'):
-                try:
-                    d['outcomes'] = json.loads(d['outcomes'])
-                except:
-                    pass
-            results.append(d)
-        return results
-    finally:
-        conn.close()
+    paged = before_id is not None
+    if fields:
+        columns = _select_columns(_SESSION_COLUMNS, fields)
+        sql = _sessions_sql(columns, paged)
+    else:
+        columns = _SESSION_COLUMNS
+        sql = _SESSIONS_SQL[paged]
+    params = [project_id]
+    if paged:
+        params.append(before_id)
+    params.append(_page_limit(limit))
+    rows = get_conn().execute(sql, params).fetchall()
+    results = []
+    for r in rows:
+        d = dict(zip(columns, r))
+        if d.get('outcomes'):
+            try:
+                d['outcomes'] = _loads(d['outcomes'])
+            except:
+                pass
+        results.append(d)
+    return results
 
 
 def get_conversation_history(
     project_id: int,
     session_id: Optional[str] = None,
-    limit: int = 20
+    limit: int = 20,
+    before_id: Optional[int] = None
 ) -> list[dict]:
     """
     Get conversation history for a project.
@@ -189,14 +258,17 @@ def get_conversation_history(
     Args:
         project_id: The project ID
         session_id: Optional session filter
-        limit: Max results (default 20)
+        limit: Max results (default 20, capped at 100)
+        before_id: Pagination cursor - id of the last conversation already seen
     
     Returns:
         List of conversations
     """
     db = get_db()
-    conversations = db.get_conversation_history(project_id, session_id, limit)
-    return [c.model_dump() for c in conversations]
+    conversations = db.get_conversation_history(
+        project_id, session_id, _page_limit(limit), before_id
+    )
+    return _dump_rows(conversations)
 
 
 def initialize_session_v13(project_id: int) -> dict:
@@ -1,21 +1,35 @@
 """Story generation tools."""
 
+from typing import Optional
 from .utils import get_db
 
-def generate_project_story(project_id: int) -> dict:
+def generate_project_story(
+    project_id: int,
+    limit_per_section: Optional[int] = None,
+    section_cursors: Optional[dict[str, int]] = None
+) -> dict:
     """
     Generate narrative storyboard data for a project.
     Returns structured data that GUI renders as visual story.
     
     Args:
         project_id: The project ID
+        limit_per_section: Page large projects - at most this many
+                           components/problems/changes/learnings/sessions each
+                           (at least 1; 200 when only section_cursors is given)
+        section_cursors: Continue paging: pass back the previous page's
+                         "next_cursors" to fetch the sections that had more
     
     Returns:
         Complete story data with project, components, problems, solutions,
-        changes, learnings, sessions, and stats
+        changes, learnings, sessions, and stats (plus "next_cursors" when paged)
     """
     db = get_db()
-    return db.get_project_story_data(project_id)
+    if limit_per_section is None and section_cursors is None:
+        return db.get_project_story_data(project_id)
+    if limit_per_section is None:
+        limit_per_section = 200
+    return db.get_project_story_page(project_id, limit_per_section, section_cursors)
 
 
 def generate_problem_journey(problem_id: int) -> dict:
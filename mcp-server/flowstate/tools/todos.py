@@ -1,7 +1,7 @@
 """Todo management tools."""
 
 from typing import Optional
-from .utils import get_db, _compact_list
+from .utils import get_db, _compact_rows, _dump_rows, notify_project_write
 
 def add_todo(
     project_id: int,
@@ -27,6 +27,7 @@ def add_todo(
     """
     db = get_db()
     todo = db.add_todo(project_id, title, description, priority, component_id, due_date)
+    notify_project_write(project_id)
     return todo.model_dump()
 
 
@@ -52,6 +53,7 @@ def update_todo(
     """
     db = get_db()
     todo = db.update_todo(todo_id, status=status, priority=priority, title=title, description=description)
+    notify_project_write(todo.project_id if todo else None)
     return todo.model_dump() if todo else None
 
 
@@ -75,5 +77,4 @@ def get_todos(
     """
     db = get_db()
     todos = db.get_todos(project_id, status, priority)
-    result = [t.model_dump() for t in todos]
-    return _compact_list(result) if compact else result
+    return _compact_rows(todos) if compact else _dump_rows(todos)
@@ -1,9 +1,33 @@
 """Utility functions for FlowState tools."""
 
-from typing import Optional
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterable, Iterator, Optional
 from ..database import Database, DEFAULT_DB_PATH
 from pathlib import Path
 
+# Optional: orjson decodes/encodes the JSON list columns (key_decisions,
+# outcomes, steps) several times faster than the stdlib
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    ORJSON_AVAILABLE = False
+
+if ORJSON_AVAILABLE:
+    _loads = orjson.loads
+
+    def _dumps(obj) -> str:
+        """Serialize obj to a JSON string (orjson returns bytes)."""
+        return orjson.dumps(obj).decode()
+else:
+    _loads = json.loads
+    _dumps = json.dumps
+
 # Data directory is the parent of the database file
 # e.g. ~/Library/Application Support/flowstate/
 FLOWSTATE_DATA_DIR = DEFAULT_DB_PATH.parent
@@ -12,6 +36,30 @@ FLOWSTATE_DATA_DIR = DEFAULT_DB_PATH.parent
 # Global database instance (initialized by server)
 _db: Optional[Database] = None
 
+logger = logging.getLogger(__name__)
+
+# Background upkeep (PRAGMA optimize, WAL truncation, occasional VACUUM)
+_MAINTENANCE_INTERVAL = 600.0
+_maintenance_thread: Optional[threading.Thread] = None
+
+# Callbacks run after a tool writes project data, e.g. to drop cached
+# project contexts. Each receives the affected project_id (None = unknown).
+_project_write_listeners: list[Callable[[Optional[int]], None]] = []
+
+# Timestamp fields dropped from compact output
+_SKIP_FIELDS = frozenset({
+    'created_at', 'updated_at', 'solved_at', 'completed_at',
+    'promoted_at', 'last_used', 'started_at', 'ended_at',
+})
+
+# Free-text fields truncated to max_text_len in compact output
+_TRUNCATE_FIELDS = frozenset({
+    'description', 'insight', 'context', 'reason',
+    'notes', 'summary', 'code_snippet', 'key_insight',
+    'old_value', 'new_value', 'skill', 'focus_summary',
+})
+
+
 def _compact_dict(d: dict, max_text_len: int = 100) -> dict:
     """
     Create a compact version of a dict:
@@ -24,46 +72,140 @@ def _compact_dict(d: dict, max_text_len: int = 100) -> dict:
         return d
     
     result = {}
-    skip_fields = {'created_at', 'updated_at', 'solved_at', 'completed_at', 
-                   'promoted_at', 'last_used', 'started_at', 'ended_at'}
-    truncate_fields = {'description', 'insight', 'context', 'reason', 
-                       'notes', 'summary', 'code_snippet', 'key_insight',
-                       'old_value', 'new_value', 'skill', 'focus_summary'}
+    skip = _SKIP_FIELDS.__contains__
+    truncate = _TRUNCATE_FIELDS.__contains__
     
     for k, v in d.items():
-        # Skip None and empty values
-        if v is None or v == '' or v == []:
+        # Skip None and empty values (0 and False are kept)
+        if not v and (v is None or v == '' or v == []):
             continue
         # Skip timestamp fields
-        if k in skip_fields:
+        if skip(k):
             continue
-        # Truncate long text
-        if k in truncate_fields and isinstance(v, str) and len(v) > max_text_len:
-            result[k] = v[:max_text_len] + '...'
-        elif isinstance(v, dict):
-            result[k] = _compact_dict(v, max_text_len)
-        elif isinstance(v, list) and v and isinstance(v[0], dict):
-            result[k] = [_compact_dict(item, max_text_len) for item in v]
-        else:
-            result[k] = v
+        # Exact type checks first; subclasses fall through to isinstance
+        t = type(v)
+        if t is str or isinstance(v, str):
+            # Truncate long text
+            if truncate(k) and len(v) > max_text_len:
+                v = v[:max_text_len] + '...'
+        elif t is dict or isinstance(v, dict):
+            v = _compact_dict(v, max_text_len)
+        elif (t is list or isinstance(v, list)) and isinstance(v[0], dict):
+            v = [_compact_dict(item, max_text_len) for item in v]
+        result[k] = v
     
     return result
 
 
-def _compact_list(items: list, max_text_len: int = 100) -> list:
-    """Compact a list of dicts."""
-    return [_compact_dict(item, max_text_len) for item in items]
+def _iter_compact(items: Iterable[dict], max_text_len: int = 100) -> Iterator[dict]:
+    """Compact dicts one at a time, so callers needn't hold the uncompacted list."""
+    for item in items:
+        yield _compact_dict(item, max_text_len)
+
+
+def _compact_list(items: Iterable[dict], max_text_len: int = 100) -> list:
+    """Compact a list (or any iterable) of dicts."""
+    return list(_iter_compact(items, max_text_len))
+
+
+def _compact_rows(models: list, max_text_len: int = 100) -> list[dict]:
+    """
+    _compact_list(_dump_rows(models)) without the intermediate dumps:
+    _compact_dict only reads its input, so each model's __dict__ is
+    compacted in place of a copy.
+    """
+    return list(_iter_compact((m.__dict__ for m in models), max_text_len))
+
+
+def _dump_rows(models: list) -> list[dict]:
+    """
+    model_dump() for a list of flat row models (Project, Component, ...).
+    They have no nested models or custom serializers, so a copy of each
+    instance __dict__ is equivalent and skips pydantic's serializer.
+    """
+    return [m.__dict__.copy() for m in models]
+
+
+def _fetch_dicts(cursor: sqlite3.Cursor) -> list[dict]:
+    """fetchall() as dicts, resolving column names once per query instead of per row."""
+    columns = [d[0] for d in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _fmt_now(fmt: str = "%Y-%m-%d %H:%M:%S") -> str:
+    """Format the current local time (time.strftime - no datetime objects)."""
+    return time.strftime(fmt, time.localtime())
 
 
 def get_db() -> Database:
-    """Get the database instance."""
+    """
+    Get the database instance.
+    A plain global check - cheaper per call than an lru_cache wrapper, and
+    set_db() can swap the instance without any cache to clear.
+    """
     global _db
     if _db is None:
         _db = Database()
+        _start_maintenance()
     return _db
 
 
+def _start_maintenance() -> None:
+    """Start the background thread that runs Database.maintain() (once per process)."""
+    global _maintenance_thread
+    if _maintenance_thread is None:
+        _maintenance_thread = threading.Thread(
+            target=_maintenance_loop, name="flowstate-db-maintenance", daemon=True
+        )
+        _maintenance_thread.start()
+
+
+def _maintenance_loop() -> None:
+    """Maintain whichever database is current, every _MAINTENANCE_INTERVAL seconds."""
+    while True:
+        time.sleep(_MAINTENANCE_INTERVAL)
+        db = _db
+        if db is None:
+            continue
+        try:
+            db.maintain()
+        except sqlite3.OperationalError:
+            # Busy with a writer (or the GUI) - try again next round
+            pass
+        except Exception:
+            # Anything else (e.g. a malformed database file) would end the
+            # thread for good - report it and keep the schedule
+            logger.exception("Database maintenance failed")
+
+
 def set_db(db: Database) -> None:
     """Set the database instance (for testing)."""
     global _db
     _db = db
+    notify_project_write()
+
+
+def get_conn() -> sqlite3.Connection:
+    """
+    Get the current thread's pooled connection to the database.
+    Kept open between tool calls - use `with conn:` for writes, never close it.
+    """
+    return get_db().get_conn()
+
+
+@atexit.register
+def _close_db() -> None:
+    if _db is not None:
+        _db.close()
+
+
+def on_project_write(listener: Callable[[Optional[int]], None]) -> Callable[[Optional[int]], None]:
+    """Register a callback to run whenever a tool writes project data."""
+    _project_write_listeners.append(listener)
+    return listener
+
+
+def notify_project_write(project_id: Optional[int] = None) -> None:
+    """Tell listeners that a project's data changed (None = any project)."""
+    for listener in _project_write_listeners:
+        listener(project_id)
@@ -1,8 +1,93 @@
 """Project variables and methods tools."""
 
+import sqlite3
+import threading
+import time
 from typing import Optional
-import json
-from .utils import get_db
+from .utils import get_conn, _dumps, _loads, on_project_write, notify_project_write
+
+# SQL shared by several functions - one string object per statement so
+# every call hits the connection's prepared-statement cache. List queries
+# name their columns so rows can be zipped into dicts without dict(row).
+_VARIABLE_COLUMNS = (
+    "id", "project_id", "category", "name", "value", "is_secret",
+    "description", "created_at", "updated_at",
+)
+_METHOD_COLUMNS = (
+    "id", "project_id", "name", "description", "category", "steps",
+    "code_example", "related_component_id", "created_at", "updated_at",
+)
+_LIST_VARIABLES_SQL = (
+    f"SELECT {', '.join(_VARIABLE_COLUMNS)} FROM project_variables"
+    " WHERE project_id = ? ORDER BY category, name"
+)
+_LIST_VARIABLES_BY_CATEGORY_SQL = (
+    f"SELECT {', '.join(_VARIABLE_COLUMNS)} FROM project_variables"
+    " WHERE project_id = ? AND category = ? ORDER BY category, name"
+)
+_LIST_METHODS_SQL = (
+    f"SELECT {', '.join(_METHOD_COLUMNS)} FROM project_methods"
+    " WHERE project_id = ? ORDER BY category, name"
+)
+_LIST_METHODS_BY_CATEGORY_SQL = (
+    f"SELECT {', '.join(_METHOD_COLUMNS)} FROM project_methods"
+    " WHERE project_id = ? AND category = ? ORDER BY category, name"
+)
+
+# Read cache for get_project_variables / get_project_methods, which are
+# fetched on nearly every session start but rarely change:
+# (table, project_id, category) -> (monotonic timestamp, connection,
+# PRAGMA data_version, raw row tuples). Rows are kept as tuples and turned
+# into fresh dicts per call, so callers can't modify the cached copy.
+_LIST_CACHE_TTL = 30.0
+_list_cache: dict[tuple, tuple[float, sqlite3.Connection, int, tuple]] = {}
+# Bumped on every write so a read racing a write can't store stale rows
+_list_generation = 0
+_list_lock = threading.Lock()
+
+
+@on_project_write
+def _invalidate_list_cache(project_id: Optional[int] = None) -> None:
+    """Drop cached variable/method lists for a project (or all of them)."""
+    global _list_generation
+    with _list_lock:
+        _list_generation += 1
+        if project_id is None:
+            _list_cache.clear()
+            return
+        for key in [k for k in _list_cache if k[1] == project_id]:
+            del _list_cache[key]
+
+
+def _cached_rows(key: tuple, conn: sqlite3.Connection) -> tuple[Optional[tuple], int, int]:
+    """
+    Cached rows for key (or None), plus the current generation and the
+    connection's data_version. data_version changes whenever another
+    connection (e.g. the desktop app) commits, so those edits are seen
+    immediately rather than after the TTL.
+    """
+    data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    with _list_lock:
+        entry = _list_cache.get(key)
+        if (entry is not None
+                and time.monotonic() - entry[0] < _LIST_CACHE_TTL
+                and entry[1] is conn and entry[2] == data_version):
+            return entry[3], _list_generation, data_version
+        return None, _list_generation, data_version
+
+
+def _store_rows(
+    key: tuple,
+    generation: int,
+    conn: sqlite3.Connection,
+    data_version: int,
+    rows: tuple
+) -> None:
+    """Cache rows for key unless a write happened while they were read."""
+    with _list_lock:
+        if generation == _list_generation:
+            _list_cache[key] = (time.monotonic(), conn, data_version, rows)
+
 
 def create_project_variable(
     project_id: int,
@@ -26,23 +111,17 @@ def create_project_variable(
     Returns:
         The created variable
     """
-    db = get_db()
-    conn = db._conn()
-    try:
-        cursor = conn.execute(
+    conn = get_conn()
+    with conn:
+        var = conn.execute(
             """INSERT INTO project_variables 
                (project_id, name, value, category, is_secret, description)
-               VALUES (?, ?, ?, ?, ?, ?)""",
+               VALUES (?, ?, ?, ?, ?, ?)
+               RETURNING *""",
             (project_id, name, value, category, is_secret, description)
-        )
-        conn.commit()
-        var = conn.execute(
-            "SELECT * FROM project_variables WHERE id = ?",
-            (cursor.lastrowid,)
         ).fetchone()
-        return dict(var)
-    finally:
-        conn.close()
+    notify_project_write(project_id)
+    return dict(var)
 
 
 def get_project_variables(
@@ -59,22 +138,17 @@ def get_project_variables(
     Returns:
         List of variables
     """
-    db = get_db()
-    conn = db._conn()
-    try:
+    key = ("variables", project_id, category)
+    conn = get_conn()
+    rows, generation, data_version = _cached_rows(key, conn)
+    if rows is None:
         if category:
-            rows = conn.execute(
-                "SELECT * FROM project_variables WHERE project_id = ? AND category = ? ORDER BY category, name",
-                (project_id, category)
-            ).fetchall()
+            cursor = conn.execute(_LIST_VARIABLES_BY_CATEGORY_SQL, (project_id, category))
         else:
-            rows = conn.execute(
-                "SELECT * FROM project_variables WHERE project_id = ? ORDER BY category, name",
-                (project_id,)
-            ).fetchall()
-        return [dict(r) for r in rows]
-    finally:
-        conn.close()
+            cursor = conn.execute(_LIST_VARIABLES_SQL, (project_id,))
+        rows = tuple(tuple(r) for r in cursor)
+        _store_rows(key, generation, conn, data_version, rows)
+    return [dict(zip(_VARIABLE_COLUMNS, r)) for r in rows]
 
 
 def update_project_variable(
@@ -99,44 +173,40 @@ def update_project_variable(
     Returns:
         Updated variable or None if not found
     """
-    db = get_db()
-    conn = db._conn()
-    try:
-        updates = []
-        params = []
-        if name is not None:
-            updates.append("name = ?")
-            params.append(name)
-        if value is not None:
-            updates.append("value = ?")
-            params.append(value)
-        if category is not None:
-            updates.append("category = ?")
-            params.append(category)
-        if is_secret is not None:
-            updates.append("is_secret = ?")
-            params.append(is_secret)
-        if description is not None:
-            updates.append("description = ?")
-            params.append(description)
-        
-        if not updates:
-            return None
-        
-        params.append(variable_id)
-        conn.execute(
-            f"UPDATE project_variables SET {', '.join(updates)} WHERE id = ?",
-            params
-        )
-        conn.commit()
-        
+    conn = get_conn()
+    updates = []
+    params = []
+    if name is not None:
+        updates.append("name = ?")
+        params.append(name)
+    if value is not None:
+        updates.append("value = ?")
+        params.append(value)
+    if category is not None:
+        updates.append("category = ?")
+        params.append(category)
+    if is_secret is not None:
+        updates.append("is_secret = ?")
+        params.append(is_secret)
+    if description is not None:
+        updates.append("description = ?")
+        params.append(description)
+    
+    if not updates:
+        return None
+    # Set here too: RETURNING sees the row before the updated_at trigger runs
+    updates.append("updated_at = CURRENT_TIMESTAMP")
+    
+    params.append(variable_id)
+    with conn:
         var = conn.execute(
-            "SELECT * FROM project_variables WHERE id = ?",
-            (variable_id,)
+            f"UPDATE project_variables SET {', '.join(updates)} WHERE id = ? RETURNING *",
+            params
         ).fetchone()
-        return dict(var) if var else None
-    finally:
-        conn.close()
+    if not var:
+        return None
+    notify_project_write(var['project_id'])
+    return dict(var)
 
 
 def delete_project_variable(variable_id: int) -> bool:
@@ -149,17 +219,16 @@ def delete_project_variable(variable_id: int) -> bool:
     Returns:
         True if deleted, False if not found
     """
-    db = get_db()
-    conn = db._conn()
-    try:
-        cursor = conn.execute(
-            "DELETE FROM project_variables WHERE id = ?",
+    conn = get_conn()
+    with conn:
+        deleted = conn.execute(
+            "DELETE FROM project_variables WHERE id = ? RETURNING project_id",
             (variable_id,)
-        )
-        conn.commit()
-        return cursor.rowcount > 0
-    finally:
-        conn.close()
+        ).fetchone()
+    if not deleted:
+        return False
+    notify_project_write(deleted[0])
+    return True
 
 
 def create_project_method(
@@ -186,28 +255,21 @@ def create_project_method(
     Returns:
         The created method
     """
-    import json
-    db = get_db()
-    conn = db._conn()
-    try:
-        steps_json = json.dumps(steps) if steps else None
-        cursor = conn.execute(
+    conn = get_conn()
+    steps_json = _dumps(steps) if steps else None
+    with conn:
+        method = conn.execute(
             """INSERT INTO project_methods 
                (project_id, name, description, category, steps, code_example, related_component_id)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               RETURNING *""",
             (project_id, name, description, category, steps_json, code_example, related_component_id)
-        )
-        conn.commit()
-        method = conn.execute(
-            "SELECT * FROM project_methods WHERE id = ?",
-            (cursor.lastrowid,)
         ).fetchone()
-        result = dict(method)
-        if result.get('steps'):
-            result['steps'] = json.loads(result['steps'])
-        return result
-    finally:
-        conn.close()
+    notify_project_write(project_id)
+    result = dict(method)
+    if result.get('steps'):
+        result['steps'] = _loads(result['steps'])
+    return result
 
 
 def get_project_methods(
@@ -224,29 +286,23 @@ def get_project_methods(
     Returns:
         List of methods
     """
-    import json
-    db = get_db()
-    conn = db._conn()
-    try:
+    key = ("methods", project_id, category)
+    conn = get_conn()
+    rows, generation, data_version = _cached_rows(key, conn)
+    if rows is None:
         if category:
-            rows = conn.execute(
-                "SELECT * FROM project_methods WHERE project_id = ? AND category = ? ORDER BY category, name",
-                (project_id, category)
-            ).fetchall()
+            cursor = conn.execute(_LIST_METHODS_BY_CATEGORY_SQL, (project_id, category))
         else:
-            rows = conn.execute(
-                "SELECT * FROM project_methods WHERE project_id = ? ORDER BY category, name",
-                (project_id,)
-            ).fetchall()
-        results = []
-        for r in rows:
-            d = dict(r)
-            if d.get('steps'):
-                d['steps'] = json.loads(d['steps'])
-            results.append(d)
-        return results
-    finally:
-        conn.close()
+            cursor = conn.execute(_LIST_METHODS_SQL, (project_id,))
+        rows = tuple(tuple(r) for r in cursor)
+        _store_rows(key, generation, conn, data_version, rows)
+    results = []
+    for r in rows:
+        d = dict(zip(_METHOD_COLUMNS, r))
+        if d.get('steps'):
+            d['steps'] = _loads(d['steps'])
+        results.append(d)
+    return results
 
 
 def update_project_method(
@@ -273,53 +329,46 @@ def update_project_method(
     Returns:
         Updated method or None if not found
     """
-    import json
-    db = get_db()
-    conn = db._conn()
-    try:
-        updates = []
-        params = []
-        if name is not None:
-            updates.append("name = ?")
-            params.append(name)
-        if description is not None:
-            updates.append("description = ?")
-            params.append(description)
-        if category is not None:
-            updates.append("category = ?")
-            params.append(category)
-        if steps is not None:
-            updates.append("steps = ?")
-            params.append(json.dumps(steps))
-        if code_example is not None:
-            updates.append("code_example = ?")
-            params.append(code_example)
-        if related_component_id is not None:
-            updates.append("related_component_id = ?")
-            params.append(related_component_id)
-        
-        if not updates:
-            return None
-        
-        params.append(method_id)
-        conn.execute(
-            f"UPDATE project_methods SET {', '.join(updates)} WHERE id = ?",
-            params
-        )
-        conn.commit()
-        
+    conn = get_conn()
+    updates = []
+    params = []
+    if name is not None:
+        updates.append("name = ?")
+        params.append(name)
+    if description is not None:
+        updates.append("description = ?")
+        params.append(description)
+    if category is not None:
+        updates.append("category = ?")
+        params.append(category)
+    if steps is not None:
+        updates.append("steps = ?")
+        params.append(_dumps(steps))
+    if code_example is not None:
+        updates.append("code_example = ?")
+        params.append(code_example)
+    if related_component_id is not None:
+        updates.append("related_component_id = ?")
+        params.append(related_component_id)
+    
+    if not updates:
+        return None
+    # Set here too: RETURNING sees the row before the updated_at trigger runs
+    updates.append("updated_at = CURRENT_TIMESTAMP")
+    
+    params.append(method_id)
+    with conn:
         method = conn.execute(
-            "SELECT * FROM project_methods WHERE id = ?",
-            (method_id,)
+            f"UPDATE project_methods SET {', '.join(updates)} WHERE id = ? RETURNING *",
+            params
         ).fetchone()
-        if method:
-            result = dict(method)
-            if result.get('steps'):
-                result['steps'] = json.loads(result['steps'])
-            return result
-        return None
-    finally:
-        conn.close()
+    if method:
+        notify_project_write(method['project_id'])
+        result = dict(method)
+        if result.get('steps'):
+            result['steps'] = _loads(result['steps'])
+        return result
+    return None
 
 
 def delete_project_method(method_id: int) -> bool:
@@ -332,14 +381,13 @@ def delete_project_method(method_id: int) -> bool:
     Returns:
         True if deleted, False if not found
     """
-    db = get_db()
-    conn = db._conn()
-    try:
-        cursor = conn.execute(
-            "DELETE FROM project_methods WHERE id = ?",
+    conn = get_conn()
+    with conn:
+        deleted = conn.execute(
+            "DELETE FROM project_methods WHERE id = ? RETURNING project_id",
             (method_id,)
-        )
-        conn.commit()
-        return cursor.rowcount > 0
-    finally:
-        conn.close()
+        ).fetchone()
+    if not deleted:
+        return False
+    notify_project_write(deleted[0])
+    return True
@@ -10,15 +10,29 @@ Usage:
     python3 mcp-switch.py only flowstate     # Enable ONLY these, disable rest
     python3 mcp-switch.py preset minimal     # Use a preset configuration
     python3 mcp-switch.py preset ios         # Preset for iOS development
+    python3 mcp-switch.py on gh off xcode    # Combine on/off/only, saved once
 
 After changes, restart Claude Desktop to apply.
 """
 
-import json
 import os
+import shutil
 import sys
+from contextlib import contextmanager
 from pathlib import Path
 
+# Optional: orjson parses/serializes the config straight from/to UTF-8 bytes
+try:
+    import orjson
+    _loads = orjson.loads
+    def _dumps(data):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+    _loads = json.loads
+    def _dumps(data):
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
 # Config location
 CONFIG_PATH = Path.home() / "Library/Application Support/Claude/claude_desktop_config.json"
 BACKUP_PATH = Path.home() / "Library/Application Support/Claude/claude_desktop_config.backup.json"
@@ -41,6 +55,21 @@ ALL_MCPS = {
     # Add more MCPs here as needed
 }
 
+# Config key written for MCPs whose key differs from their name here
+CANONICAL_KEYS = {
+    "xcode": "XcodeBuildMCP",
+}
+# Lower-cased config key -> MCP name, for matching existing config entries
+_KEY_TO_NAME = {key.lower(): name for name, key in CANONICAL_KEYS.items()}
+
+def _canon(key):
+    """Normalize a config key for matching (XcodeBuildMCP -> xcode)"""
+    key = key.lower()
+    return _KEY_TO_NAME.get(key, key)
+
+# Canonical form of each known MCP name, computed once
+ALL_MCP_CANON = {name: _canon(name) for name in ALL_MCPS}
+
 # Presets for common workflows
 PRESETS = {
     "minimal": ["flowstate"],
@@ -59,21 +88,23 @@ ALIASES = {
 }
 
 def load_config():
-    if CONFIG_PATH.exists():
-        with open(CONFIG_PATH) as f:
-            return json.load(f)
-    return {"mcpServers": {}}
+    try:
+        return _loads(CONFIG_PATH.read_bytes())
+    except FileNotFoundError:
+        return {"mcpServers": {}}
 
 def save_config(config):
     # Backup first
     if CONFIG_PATH.exists():
-        with open(CONFIG_PATH) as f:
-            backup = f.read()
-        with open(BACKUP_PATH, 'w') as f:
-            f.write(backup)
+        shutil.copy2(CONFIG_PATH, BACKUP_PATH)
     
-    with open(CONFIG_PATH, 'w') as f:
-        json.dump(config, f, indent=2)
+    # Write alongside and rename over it, so a crash can't leave a torn config
+    tmp_path = CONFIG_PATH.with_suffix(".json.tmp")
+    # One write of the whole document, non-ASCII kept as UTF-8
+    tmp_path.write_bytes(_dumps(config))
+    if CONFIG_PATH.exists():
+        shutil.copymode(CONFIG_PATH, tmp_path)
+    os.replace(tmp_path, CONFIG_PATH)
     print(f"\n✅ Config saved. Backup at: {BACKUP_PATH}")
     print("⚠️  Restart Claude Desktop to apply changes.")
 
@@ -91,65 +122,68 @@ def show_status():
     config = load_config()
     enabled = config.get("mcpServers", {})
     
-    print("\n📊 MCP Status:")
-    print("-" * 40)
+    # Built up and written once rather than a print() per MCP
+    lines = ["\n📊 MCP Status:", "-" * 40]
     
-    for name in ALL_MCPS:
-        # Check various possible names in config
-        is_enabled = any(k.lower().replace("buildmcp", "") == name.lower().replace("buildmcp", "") 
-                        for k in enabled.keys())
+    # Check various possible names in config
+    enabled_canon = {_canon(k) for k in enabled}
+    for name, canon in ALL_MCP_CANON.items():
+        is_enabled = canon in enabled_canon
         status = "✅ ON " if is_enabled else "⬚  OFF"
-        print(f"  {status}  {name}")
+        lines.append(f"  {status}  {name}")
     
-    print("-" * 40)
-    print(f"  Total enabled: {len(enabled)}")
-    print("\nPresets available:", ", ".join(PRESETS.keys()))
+    lines.append("-" * 40)
+    lines.append(f"  Total enabled: {len(enabled)}")
+    lines.append(f"\nPresets available: {', '.join(PRESETS.keys())}")
+    sys.stdout.write("\n".join(lines) + "\n")
 
-def enable_mcps(names):
+@contextmanager
+def edit_config():
+    """Load the config once, yield its mcpServers dict to edit, save once"""
     config = load_config()
-    if "mcpServers" not in config:
-        config["mcpServers"] = {}
+    yield config.setdefault("mcpServers", {})
+    save_config(config)
+
+def enable_mcps(names, servers=None):
+    if servers is None:
+        with edit_config() as servers:
+            return enable_mcps(names, servers)
     
     for name in names:
         name = resolve_name(name)
         if name in ALL_MCPS:
             # Use proper config key names
-            key = "XcodeBuildMCP" if name == "xcode" else name
-            config["mcpServers"][key] = ALL_MCPS[name]
+            key = CANONICAL_KEYS.get(name, name)
+            servers[key] = ALL_MCPS[name]
             print(f"  ✅ Enabled: {name}")
         else:
             print(f"  ⚠️  Unknown MCP: {name}")
-    
-    save_config(config)
 
-def disable_mcps(names):
-    config = load_config()
-    servers = config.get("mcpServers", {})
+def disable_mcps(names, servers=None):
+    if servers is None:
+        with edit_config() as servers:
+            return disable_mcps(names, servers)
+    
+    # Handle different key formats: canonical name -> matching config keys
+    canon_map = {}
+    for k in servers:
+        canon_map.setdefault(_canon(k), []).append(k)
     
     for name in names:
         name = resolve_name(name)
-        # Handle different key formats
-        keys_to_remove = [k for k in servers if k.lower().replace("buildmcp", "") == name.lower().replace("buildmcp", "")]
+        keys_to_remove = canon_map.pop(_canon(name), [])
         for key in keys_to_remove:
             del servers[key]
             print(f"  ⬚  Disabled: {name}")
-    
-    save_config(config)
 
-def only_mcps(names):
+def only_mcps(names, servers=None):
     """Enable only these MCPs, disable everything else"""
-    config = {"mcpServers": {}}
+    if servers is None:
+        with edit_config() as servers:
+            return only_mcps(names, servers)
     
-    for name in names:
-        name = resolve_name(name)
-        if name in ALL_MCPS:
-            key = "XcodeBuildMCP" if name == "xcode" else name
-            config["mcpServers"][key] = ALL_MCPS[name]
-            print(f"  ✅ Enabled: {name}")
-        else:
-            print(f"  ⚠️  Unknown MCP: {name}")
-    
-    save_config(config)
+    servers.clear()
+    enable_mcps(names, servers)
 
 def apply_preset(preset_name):
     if preset_name not in PRESETS:
@@ -160,6 +194,23 @@ def apply_preset(preset_name):
     print(f"\n🎛️  Applying preset: {preset_name}")
     only_mcps(PRESETS[preset_name])
 
+# on/off/only -> (function, heading printed before its changes)
+_OPS = {
+    "on": (enable_mcps, "\n🔌 Enabling MCPs:"),
+    "off": (disable_mcps, "\n🔌 Disabling MCPs:"),
+    "only": (only_mcps, "\n🔌 Enabling ONLY these MCPs:"),
+}
+
+def _parse_ops(argv):
+    """Split e.g. ['on', 'gh', 'off', 'xc'] into [('on', ['gh']), ('off', ['xc'])]"""
+    ops = []
+    for arg in argv:
+        if arg.lower() in _OPS:
+            ops.append((arg.lower(), []))
+        else:
+            ops[-1][1].append(arg)
+    return ops
+
 def main():
     if len(sys.argv) < 2:
         show_status()
@@ -176,26 +227,18 @@ def main():
         for name, mcps in PRESETS.items():
             print(f"  • {name}: {', '.join(mcps)}")
     
-    elif cmd == "on":
-        if not args:
-            print("Usage: mcp-switch.py on <mcp1> <mcp2> ...")
-            return
-        print("\n🔌 Enabling MCPs:")
-        enable_mcps(args)
-    
-    elif cmd == "off":
-        if not args:
-            print("Usage: mcp-switch.py off <mcp1> <mcp2> ...")
-            return
-        print("\n🔌 Disabling MCPs:")
-        disable_mcps(args)
-    
-    elif cmd == "only":
-        if not args:
-            print("Usage: mcp-switch.py only <mcp1> <mcp2> ...")
-            return
-        print("\n🔌 Enabling ONLY these MCPs:")
-        only_mcps(args)
+    elif cmd in _OPS:
+        ops = _parse_ops([cmd] + args)
+        for op, names in ops:
+            if not names:
+                print(f"Usage: mcp-switch.py {op} <mcp1> <mcp2> ...")
+                return
+        # Every op edits the same loaded config; it's saved once at the end
+        with edit_config() as servers:
+            for op, names in ops:
+                func, heading = _OPS[op]
+                print(heading)
+                func(names, servers)
     
     elif cmd == "preset":
         if not args:
@@ -15,12 +15,25 @@ Usage:
 Disabling works by renaming the key with _DISABLED suffix.
 """
 
-import json
+import copy
+import functools
 import sys
 import os
-import shutil
+from operator import itemgetter
 from pathlib import Path
-from datetime import datetime
+
+# Optional: orjson parses/serializes the config straight from/to UTF-8 bytes
+try:
+    import orjson
+    _loads = orjson.loads
+    def _dumps(data):
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+    _loads = json.loads
+    def _dumps(data):
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+# shutil and datetime are imported where used - most runs (list) never need them
 
 # Configuration
 CONFIG_PATH = Path.home() / "Library/Application Support/Claude/claude_desktop_config.json"
@@ -60,43 +73,69 @@ class Colors:
     BOLD = '\033[1m'
     END = '\033[0m'
 
+# Checked once - stdout doesn't change during a run
+_USE_COLOR = sys.stdout.isatty()
+_ON_DOT = f"{Colors.GREEN}●{Colors.END}" if _USE_COLOR else "●"
+_OFF_DOT = f"{Colors.RED}○{Colors.END}" if _USE_COLOR else "○"
+
 def color(text, c):
     """Apply color if terminal supports it"""
-    if sys.stdout.isatty():
-        return f"{c}{text}{Colors.END}"
-    return text
+    return f"{c}{text}{Colors.END}" if _USE_COLOR else text
+
+@functools.lru_cache(maxsize=1)
+def _load_config_cached(path, mtime_ns):
+    """Parse the config file; cached per (path, mtime) - treat as read-only"""
+    return _loads(path.read_bytes())
 
 def load_config():
-    """Load Claude Desktop config"""
-    if not CONFIG_PATH.exists():
+    """Load Claude Desktop config (shared snapshot - copy before mutating)"""
+    try:
+        mtime_ns = CONFIG_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
         print(color(f"Error: Config not found at {CONFIG_PATH}", Colors.RED))
         sys.exit(1)
     
-    with open(CONFIG_PATH, 'r') as f:
-        return json.load(f)
+    return _load_config_cached(CONFIG_PATH, mtime_ns)
+
+def _write_json(path, data):
+    """Write JSON to a temp file and rename it over path (atomic on POSIX)"""
+    tmp_path = path.with_suffix(".json.tmp")
+    # One write of the whole document, non-ASCII kept as UTF-8
+    tmp_path.write_bytes(_dumps(data))
+    if path.exists():
+        import shutil
+        shutil.copymode(path, tmp_path)
+    os.replace(tmp_path, path)
 
 def save_config(config):
     """Save Claude Desktop config"""
-    with open(CONFIG_PATH, 'w') as f:
-        json.dump(config, f, indent=2)
+    _write_json(CONFIG_PATH, config)
+    _load_config_cached.cache_clear()
 
 def ensure_backup():
     """Create backup if it doesn't exist"""
     if not BACKUP_PATH.exists():
+        import shutil
         shutil.copy2(CONFIG_PATH, BACKUP_PATH)
         print(color(f"Created backup at {BACKUP_PATH}", Colors.BLUE))
 
+@functools.lru_cache(maxsize=1)
+def _load_presets_cached(mtime_ns):
+    """Parse the presets file; cached per mtime - treat as read-only"""
+    return _loads(PRESETS_PATH.read_bytes())
+
 def load_presets():
     """Load presets from file or use defaults"""
-    if PRESETS_PATH.exists():
-        with open(PRESETS_PATH, 'r') as f:
-            return json.load(f)
-    return DEFAULT_PRESETS
+    try:
+        mtime_ns = PRESETS_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return DEFAULT_PRESETS
+    return _load_presets_cached(mtime_ns)
 
 def save_presets(presets):
     """Save presets to file"""
-    with open(PRESETS_PATH, 'w') as f:
-        json.dump(presets, f, indent=2)
+    _write_json(PRESETS_PATH, presets)
+    _load_presets_cached.cache_clear()
 
 
 def get_mcp_servers(config):
@@ -105,20 +144,48 @@ def get_mcp_servers(config):
     mcp_servers = config.get("mcpServers", {})
     
     for key, value in mcp_servers.items():
-        is_disabled = key.endswith("_DISABLED")
-        name = key[:-9] if is_disabled else key  # Remove _DISABLED suffix
-        servers.append({
-            "key": key,
-            "name": name,
-            "enabled": not is_disabled,
-            "config": value
-        })
+        servers.append(_server_entry(key, value))
     
     # Sort by name for consistent ordering
-    servers.sort(key=lambda x: x["name"].lower())
+    servers.sort(key=itemgetter("name_lower"))
     return servers
 
-def find_server(servers, identifier):
+def _server_entry(key, value):
+    """Describe one mcpServers entry"""
+    is_disabled = key.endswith("_DISABLED")
+    name = key[:-9] if is_disabled else key  # Remove _DISABLED suffix
+    return {
+        "key": key,
+        "name": name,
+        "name_lower": name.lower(),
+        "enabled": not is_disabled,
+        "config": value
+    }
+
+def _find_server_fast(mcp_servers, identifier):
+    """Look up a server by its literal name without building the full list"""
+    # Numbers index the sorted list, and "x_DISABLED" isn't a server name
+    try:
+        int(identifier)
+        return None
+    except ValueError:
+        pass
+    if identifier.endswith("_DISABLED"):
+        return None
+    
+    for key in (identifier, f"{identifier}_DISABLED"):
+        if key in mcp_servers:
+            return _server_entry(key, mcp_servers[key])
+    return None
+
+def index_servers(servers):
+    """Map lower-cased name -> server (first in list order wins)"""
+    index = {}
+    for server in servers:
+        index.setdefault(server["name_lower"], server)
+    return index
+
+def find_server(servers, identifier, index=None):
     """Find server by name or number"""
     # Try as number first
     try:
@@ -128,16 +195,26 @@ def find_server(servers, identifier):
     except ValueError:
         pass
     
-    # Try as name (case-insensitive partial match)
+    # Try as name (case-insensitive): exact match, then partial match
     identifier_lower = identifier.lower()
+    if index is None:
+        index = index_servers(servers)
+    server = index.get(identifier_lower)
+    if server:
+        return server
     for server in servers:
-        if server["name"].lower() == identifier_lower:
-            return server
-        if identifier_lower in server["name"].lower():
+        if identifier_lower in server["name_lower"]:
             return server
     
     return None
 
+def resolve_server(config, identifier):
+    """Find one server: direct key lookup first, full list search if needed"""
+    server = _find_server_fast(config.get("mcpServers", {}), identifier)
+    if server is None:
+        server = find_server(get_mcp_servers(config), identifier)
+    return server
+
 def cmd_list(config):
     """List all MCP servers with status"""
     servers = get_mcp_servers(config)
@@ -146,29 +223,29 @@ def cmd_list(config):
         print("No MCP servers configured.")
         return
     
-    print(color("\nMCP Servers:", Colors.BOLD))
-    print("-" * 50)
+    # Built up and written once rather than a print() per server
+    lines = [color("\nMCP Servers:", Colors.BOLD), "-" * 50]
     
     enabled_count = 0
     for i, server in enumerate(servers, 1):
         if server["enabled"]:
-            status = color("●", Colors.GREEN)
+            status = _ON_DOT
             enabled_count += 1
         else:
-            status = color("○", Colors.RED)
+            status = _OFF_DOT
         
         name = server["name"]
-        print(f"  {i:2}. {status} {name}")
+        lines.append(f"  {i:2}. {status} {name}")
     
-    print("-" * 50)
-    print(f"Total: {len(servers)} | Enabled: {color(str(enabled_count), Colors.GREEN)} | Disabled: {color(str(len(servers) - enabled_count), Colors.RED)}")
-    print(color("\nRestart Claude Desktop for changes to take effect.", Colors.YELLOW))
+    lines.append("-" * 50)
+    lines.append(f"Total: {len(servers)} | Enabled: {color(str(enabled_count), Colors.GREEN)} | Disabled: {color(str(len(servers) - enabled_count), Colors.RED)}")
+    lines.append(color("\nRestart Claude Desktop for changes to take effect.", Colors.YELLOW))
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def cmd_enable(config, identifier):
     """Enable an MCP server"""
-    servers = get_mcp_servers(config)
-    server = find_server(servers, identifier)
+    server = resolve_server(config, identifier)
     
     if not server:
         print(color(f"Error: Server '{identifier}' not found", Colors.RED))
@@ -181,6 +258,7 @@ def cmd_enable(config, identifier):
     ensure_backup()
     
     # Rename key (remove _DISABLED suffix)
+    config = copy.deepcopy(config)
     mcp_servers = config["mcpServers"]
     mcp_servers[server["name"]] = mcp_servers.pop(server["key"])
     
@@ -190,8 +268,7 @@ def cmd_enable(config, identifier):
 
 def cmd_disable(config, identifier):
     """Disable an MCP server"""
-    servers = get_mcp_servers(config)
-    server = find_server(servers, identifier)
+    server = resolve_server(config, identifier)
     
     if not server:
         print(color(f"Error: Server '{identifier}' not found", Colors.RED))
@@ -204,6 +281,7 @@ def cmd_disable(config, identifier):
     ensure_backup()
     
     # Rename key (add _DISABLED suffix)
+    config = copy.deepcopy(config)
     mcp_servers = config["mcpServers"]
     mcp_servers[f"{server['name']}_DISABLED"] = mcp_servers.pop(server["key"])
     
@@ -215,19 +293,19 @@ def cmd_disable(config, identifier):
 def cmd_only(config, identifiers):
     """Enable only specified servers, disable all others"""
     servers = get_mcp_servers(config)
+    index = index_servers(servers)
     
-    # Find all specified servers
-    to_enable = []
+    # Find all specified servers (dict as an ordered set of names)
+    to_enable = {}
     for identifier in identifiers:
-        server = find_server(servers, identifier)
+        server = find_server(servers, identifier, index)
         if not server:
             print(color(f"Error: Server '{identifier}' not found", Colors.RED))
             return False
-        to_enable.append(server["name"])
+        to_enable[server["name"]] = None
     
     ensure_backup()
     
-    mcp_servers = config["mcpServers"]
     new_servers = {}
     
     for server in servers:
@@ -238,6 +316,7 @@ def cmd_only(config, identifiers):
             # Disable this server
             new_servers[f"{server['name']}_DISABLED"] = server["config"]
     
+    config = copy.deepcopy(config)
     config["mcpServers"] = new_servers
     save_config(config)
     
@@ -264,10 +343,12 @@ def cmd_preset(config, preset_name):
     
     enable_list = preset["enable"]
     enable_all = "*" in enable_list
+    enable_lower = [e.lower() for e in enable_list]
     
     for server in servers:
+        # Substring match, so "github" also enables e.g. "github-enterprise"
         should_enable = enable_all or any(
-            e.lower() in server["name"].lower() for e in enable_list
+            e in server["name_lower"] for e in enable_lower
         )
         
         if should_enable:
@@ -278,6 +359,7 @@ def cmd_preset(config, preset_name):
             # Keep current state
             new_servers[server["key"]] = server["config"]
     
+    config = copy.deepcopy(config)
     config["mcpServers"] = new_servers
     save_config(config)
     
@@ -306,12 +388,16 @@ def cmd_restore(config):
         print(color("Error: No backup found", Colors.RED))
         return False
     
+    import shutil
     shutil.copy2(BACKUP_PATH, CONFIG_PATH)
     print(color("✓ Restored from backup", Colors.GREEN))
     return True
 
 def cmd_backup():
     """Create manual backup"""
+    import shutil
+    from datetime import datetime
+    
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_path = CONFIG_PATH.parent / f"claude_desktop_config.{timestamp}.backup.json"
     shutil.copy2(CONFIG_PATH, backup_path)
@@ -323,63 +409,58 @@ def print_usage():
     print(__doc__)
 
 
+# command -> handler(config, args); config is None for _NO_CONFIG commands
+_DISPATCH = {
+    "list": lambda config, args: cmd_list(config),
+    "ls": lambda config, args: cmd_list(config),
+    "enable": lambda config, args: cmd_enable(config, args[0]),
+    "disable": lambda config, args: cmd_disable(config, args[0]),
+    "only": lambda config, args: cmd_only(config, args),
+    "preset": lambda config, args: cmd_preset(config, args[0]),
+    "restore": lambda config, args: cmd_restore(config),
+    "backup": lambda config, args: cmd_backup(),
+    "presets": lambda config, args: cmd_presets(),
+    "help": lambda config, args: print_usage(),
+    "--help": lambda config, args: print_usage(),
+    "-h": lambda config, args: print_usage(),
+}
+
+# Commands that don't need config loaded first
+_NO_CONFIG = frozenset({"presets", "help", "--help", "-h"})
+
+# Usage shown when a command that needs an argument gets none
+_ARG_USAGE = {
+    "enable": "Usage: mcp-toggle enable <name|number>",
+    "disable": "Usage: mcp-toggle disable <name|number>",
+    "only": "Usage: mcp-toggle only <name|number> [name|number] ...",
+    "preset": "Usage: mcp-toggle preset <n>",
+}
+
+
 def main():
     if len(sys.argv) < 2:
         print_usage()
         sys.exit(1)
     
     command = sys.argv[1].lower()
+    args = sys.argv[2:]
     
-    # Commands that don't need config loaded first
-    if command == "presets":
-        cmd_presets()
-        return
-    
-    if command == "help" or command == "--help" or command == "-h":
+    handler = _DISPATCH.get(command)
+    if handler is None:
+        print(color(f"Unknown command: {command}", Colors.RED))
         print_usage()
-        return
-    
-    # Load config for other commands
-    config = load_config()
-    
-    if command == "list" or command == "ls":
-        cmd_list(config)
-    
-    elif command == "enable":
-        if len(sys.argv) < 3:
-            print("Usage: mcp-toggle enable <name|number>")
-            sys.exit(1)
-        cmd_enable(config, sys.argv[2])
-    
-    elif command == "disable":
-        if len(sys.argv) < 3:
-            print("Usage: mcp-toggle disable <name|number>")
-            sys.exit(1)
-        cmd_disable(config, sys.argv[2])
-    
-    elif command == "only":
-        if len(sys.argv) < 3:
-            print("Usage: mcp-toggle only <name|number> [name|number] ...")
-            sys.exit(1)
-        cmd_only(config, sys.argv[2:])
-    
-    elif command == "preset":
-        if len(sys.argv) < 3:
-            print("Usage: mcp-toggle preset <n>")
-            cmd_presets()
-            sys.exit(1)
-        cmd_preset(config, sys.argv[2])
-    
-    elif command == "restore":
-        cmd_restore(config)
+        sys.exit(1)
     
-    elif command == "backup":
-        cmd_backup()
+    config = None if command in _NO_CONFIG else load_config()
     
-    else:
-        print(color(f"Unknown command: {command}", Colors.RED))
-        print_usage()
+    usage = _ARG_USAGE.get(command)
+    if usage and not args:
+        print(usage)
+        if command == "preset":
+            cmd_presets()
         sys.exit(1)
+    
+    handler(config, args)
 
 if __name__ == "__main__":
     main()
@@ -7,11 +7,12 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'mcp-server'))
 
 from flowstate.database import Database, init_db
 from pathlib import Path
+import tempfile
 
-# Use a test database
-TEST_DB = Path("/tmp/flowstate_test.db")
-if TEST_DB.exists():
-    TEST_DB.unlink()
+# Use a throwaway test database; the directory also holds SQLite's -wal/-shm
+# files, and is removed with them at the end
+TEST_DIR = tempfile.TemporaryDirectory(prefix="flowstate_test_")
+TEST_DB = Path(TEST_DIR.name) / "flowstate_test.db"
 
 print("🧪 Testing FlowState...")
 
@@ -86,10 +87,135 @@ print("\n11. Verifying problem status...")
 updated_problem = db.get_problem(problem.id)
 print(f"   ✅ Problem status: {updated_problem.status}")
 
+# git_history against git log on a repository with merges
+print("\n12. Checking git history...")
+import shutil
+import subprocess
+from flowstate.tools import git_ops
+if shutil.which("git") is None:
+    print("   ⏭️  git not installed, skipped")
+else:
+    repo_dir = Path(TEST_DIR.name) / "git_data"
+    repo_dir.mkdir()
+    commit_time = [1700000000]
+
+    def git(*args):
+        commit_time[0] += 60
+        stamp = f"{commit_time[0]} +0100"
+        env = dict(os.environ, GIT_AUTHOR_NAME="Tester", GIT_AUTHOR_EMAIL="t@example.com",
+                   GIT_COMMITTER_NAME="Tester", GIT_COMMITTER_EMAIL="t@example.com",
+                   GIT_AUTHOR_DATE=stamp, GIT_COMMITTER_DATE=stamp)
+        return subprocess.run(["git", *args], cwd=repo_dir, env=env, check=True,
+                               capture_output=True, text=True).stdout
+
+    git("init", "-q", "-b", "main")
+    git("commit", "-q", "--allow-empty", "-m", "root")
+    for branch in ("feature-a", "feature-b"):
+        git("checkout", "-q", "-b", branch, "main")
+        git("commit", "-q", "--allow-empty", "-m", f"{branch} work\n\nbody | with pipe")
+        git("checkout", "-q", "main")
+        git("commit", "-q", "--allow-empty", "-m", f"main before {branch}")
+        git("merge", "-q", "--no-ff", "-m", f"Merge {branch}", branch)
+
+    expected = [
+        dict(zip(("full_hash", "message", "date", "author"), line.split("\x00")))
+        for line in git("log", "--format=%H%x00%s%x00%ai%x00%an").splitlines()
+    ]
+    for commit in expected:
+        commit["hash"] = commit["full_hash"][:8]
+
+    saved_dir = git_ops.FLOWSTATE_DATA_DIR
+    git_ops.FLOWSTATE_DATA_DIR = repo_dir
+    try:
+        assert git_ops.git_history(limit=50) == expected
+        assert git_ops.git_history(limit=3) == expected[:3]
+        if git_ops.PYGIT2_AVAILABLE:
+            # Same answer without pygit2, through the streamed git log
+            git_ops.PYGIT2_AVAILABLE = False
+            try:
+                assert git_ops.git_history(limit=50) == expected
+            finally:
+                git_ops.PYGIT2_AVAILABLE = True
+    finally:
+        git_ops.FLOWSTATE_DATA_DIR = saved_dir
+    print(f"   ✅ History matches git log ({len(expected)} commits, 2 merges)")
+
+# Attach two files that share a name in one call
+print("\n13. Attaching files...")
+import hashlib
+from flowstate import tools
+from flowstate.tools import files
+tools.set_db(db)
+files.FLOWSTATE_DATA_DIR = Path(TEST_DIR.name) / "data"
+sources = []
+for i, folder in enumerate(("first", "second")):
+    source = Path(TEST_DIR.name) / folder / "notes.txt"
+    source.parent.mkdir()
+    source.write_text(f"notes from the {folder} folder\n" * (i + 1))
+    sources.append(source)
+attached = tools.attach_files(project.id, [str(p) for p in sources], tags=["docs"])
+assert [a["id"] for a in attached] == list(range(attached[0]["id"], attached[0]["id"] + 2))
+assert [a["file_path"] for a in attached] == ["attachments/notes.txt", "attachments/notes_1.txt"]
+assert [a["file_hash"] for a in attached] == [
+    hashlib.sha256(p.read_bytes()).hexdigest() for p in sources
+]
+bundle = files._get_project_bundle_path(project.name)
+assert [(bundle / a["file_path"]).read_bytes() for a in attached] == [p.read_bytes() for p in sources]
+# A failed copy (a directory can't be copied) leaves no partial attachments behind
+before = sorted((bundle / "attachments").iterdir())
+try:
+    tools.attach_files(project.id, [str(sources[0]), str(sources[1].parent)])
+except OSError:
+    pass
+else:
+    raise AssertionError("attaching a directory should fail")
+assert sorted((bundle / "attachments").iterdir()) == before
+assert len(tools.get_attachments(project_id=project.id)) == 2
+print(f"   ✅ Attached {len(attached)} files: {', '.join(a['file_path'] for a in attached)}")
+
+# Page through conversations that share one created_at
+print("\n14. Paging conversations...")
+logged = [tools.log_conversation(project.id, f"question {i}")["id"] for i in range(7)]
+with db.get_conn() as conn:
+    conn.execute("UPDATE conversations SET created_at = '2024-01-01 12:00:00' WHERE project_id = ?",
+                 (project.id,))
+pages = []
+before_id = None
+while True:
+    page = tools.get_conversations(project.id, limit=3, before_id=before_id,
+                                   fields=["user_prompt_summary"])
+    if not page:
+        break
+    pages.append(page)
+    before_id = page[-1]["id"]
+paged = [c["id"] for page in pages for c in page]
+assert paged == sorted(logged, reverse=True), paged
+assert [len(page) for page in pages] == [3, 3, 1]
+assert all(set(c) == {"id", "user_prompt_summary"} for page in pages for c in page)
+assert {c["user_prompt_summary"] for page in pages for c in page} == {f"question {i}" for i in range(7)}
+print(f"   ✅ {len(paged)} conversations over {len(pages)} pages, no duplicates or gaps")
+
+# The pooled connection follows the file when it is replaced (as git does)
+print("\n15. Replacing the database file...")
+import sqlite3
+conn = db.get_conn()
+conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+replacement = Path(TEST_DIR.name) / "replacement.db"
+shutil.copy(TEST_DB, replacement)
+other = sqlite3.connect(replacement)
+other.execute("INSERT INTO projects (name) VALUES ('Pulled Project')")
+other.commit()
+other.close()
+os.replace(replacement, TEST_DB)
+assert db.get_conn() is not conn
+assert db.get_conn().execute("SELECT 1 FROM projects WHERE name = 'Pulled Project'").fetchone()
+print("   ✅ Pooled connection reopened on the new file")
+
 print("\n" + "="*50)
 print("✅ All tests passed! FlowState is working.")
 print("="*50)
 
 # Cleanup
-TEST_DB.unlink()
+db.close()
+TEST_DIR.cleanup()
 print("\n🧹 Cleaned up test database")